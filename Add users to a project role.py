@@ -1,7 +1,8 @@
 import requests
-from requests.auth import HTTPBasicAuth
 import json
-import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from jira_client import JiraClient
 
 # --- CONFIGURATION ---
 BASE_URL = ""  # No trailing slash
@@ -11,97 +12,144 @@ API_TOKEN = ""
 # The project to scan
 PROJECT_KEY = ""
 
+# Multi-project mode: list several project keys, or set ALL_PROJECTS = True to
+# run over every project. PROJECT_KEY is used when both are left empty/False.
+PROJECT_KEYS = []
+ALL_PROJECTS = False
+
 # The Role ID you want to add users TO
 # (Run the helper function below if you don't know this ID)
 TARGET_ROLE_ID = 10000
+
+# Concurrency: projects processed at once, and role fetches / chunk posts in flight
+PROJECT_WORKERS = 4
+MAX_WORKERS = 8
+# Most accountIds sent in one POST (keeps each request under Jira's payload limits)
+ADD_CHUNK_SIZE = 100
 # ---------------------
 
-# Setup Session
-session = requests.Session()
-session.auth = HTTPBasicAuth(EMAIL, API_TOKEN)
-session.headers = {
-    "Accept": "application/json",
-    "Content-Type": "application/json"
-}
-
-def get_role_details(project_key, role_id):
-    """Fetches the self URL for a specific role in a project."""
-    url = f"{BASE_URL}/rest/api/3/project/{project_key}/role/{role_id}"
-    resp = session.get(url)
-    if resp.status_code == 404:
-        print(f"❌ Role ID {role_id} not found in project {project_key}")
-        sys.exit(1)
-    return resp.json()
+# Setup Client (pooled session, auth set once)
+client = JiraClient(BASE_URL, EMAIL, API_TOKEN, pool_size=PROJECT_WORKERS + MAX_WORKERS)
+
+def fetch_role_users(role_url):
+    """Returns the accountIds of the users (not groups) in one role, or None if it can't be read."""
+    r = client.request("GET", role_url)
+    if r.status_code != 200:
+        return None
+    users = set()
+    for actor in r.json().get('actors', []):
+        # We only want actual users (atlassian-user-role-actor), not groups
+        if actor['type'] == 'atlassian-user-role-actor':
+            # Note: actor['actorUser'] object contains the accountId
+            user_id = actor.get('actorUser', {}).get('accountId')
+            if user_id:
+                users.add(user_id)
+    return users
 
-def get_all_project_users(project_key):
+def get_project_role_users(project_key, request_pool):
     """
-    Scans ALL roles in the project to build a set of unique Account IDs.
-    This finds everyone who currently has 'some' access to the project.
+    Fetches every role of the project concurrently on request_pool.
+    Returns {role_id: set(accountIds)} for the roles that could be read.
     """
-    print(f"🔍 Scanning users in project '{project_key}'...")
-    
     # Get all role URLs for the project
-    roles_resp = session.get(f"{BASE_URL}/rest/api/3/project/{project_key}/role")
-    roles_resp.raise_for_status()
-    roles_map = roles_resp.json() # Returns {"Developers": "URL", "Admin": "URL"}
-
-    unique_users = set()
-
-    for role_name, role_url in roles_map.items():
-        # Fetch the details of who is in this role
-        # The URL provided by Jira is full path, so we use it directly
-        r = session.get(role_url)
-        if r.status_code == 200:
-            data = r.json()
-            actors = data.get('actors', [])
-            for actor in actors:
-                # We only want actual users (atlassian-user-role-actor), not groups
-                if actor['type'] == 'atlassian-user-role-actor':
-                    # Add their accountId to our set
-                    # Note: actor['actorUser'] object contains the accountId
-                    user_id = actor.get('actorUser', {}).get('accountId')
-                    if user_id:
-                        unique_users.add(user_id)
-    
-    return unique_users
+    roles_map = client.get_json(f"/rest/api/3/project/{project_key}/role") # Returns {"Developers": "URL", "Admin": "URL"}
+
+    # The URL provided by Jira is full path, so we use it directly
+    role_urls = list(roles_map.values())
+    results = request_pool.map(fetch_role_users, role_urls)
 
-def add_users_to_target_role(project_key, role_id, user_ids):
+    return {
+        int(url.rstrip('/').split('/')[-1]): users
+        for url, users in zip(role_urls, results)
+        if users is not None
+    }
+
+def post_role_chunk(url, chunk):
+    try:
+        # Payload format: { "user": ["accountId1", "accountId2"] }
+        return client.post_json(url, json={"user": chunk}), None
+    except requests.exceptions.HTTPError as e:
+        return None, e
+
+def add_users_to_target_role(project_key, role_id, user_ids, request_pool):
     """Adds a list of accountIds to the specified project role."""
     if not user_ids:
         print("⚠️ No users found to add.")
         return
 
-    print(f"🚀 Adding {len(user_ids)} users to Role ID {role_id}...")
+    print(f"🚀 Adding {len(user_ids)} users to Role ID {role_id} in {project_key}...")
     
     # We must post to the specific project-role endpoint
-    url = f"{BASE_URL}/rest/api/3/project/{project_key}/role/{role_id}"
+    url = f"/rest/api/3/project/{project_key}/role/{role_id}"
     
-    # Jira API allows adding list of users in one request (up to a limit, usually safe for small batches)
-    # Payload format: { "user": ["accountId1", "accountId2"] }
-    payload = {
-        "user": list(user_ids)
-    }
+    # One giant POST can exceed Jira's payload limits on big projects, so the adds
+    # go out in chunks of ADD_CHUNK_SIZE, posted in parallel.
+    user_ids = sorted(user_ids)
+    chunks = [user_ids[i:i + ADD_CHUNK_SIZE] for i in range(0, len(user_ids), ADD_CHUNK_SIZE)]
 
-    try:
-        resp = session.post(url, json=payload)
-        resp.raise_for_status()
-        
+    added = 0
+    data = None
+    for chunk, (chunk_data, error) in zip(chunks, request_pool.map(lambda c: post_role_chunk(url, c), chunks)):
+        if error is not None:
+            print(f"❌ Failed to add {len(chunk)} users: {error}")
+            print(f"   Response: {error.response.text}")
+            continue
+        added += len(chunk)
+        data = chunk_data
+
+    if data is not None:
         # Determine success
-        data = resp.json()
-        print(f"✅ Success! Updated role.")
+        print(f"✅ Success! Added {added} of {len(user_ids)} users to {project_key}.")
         print(f"   Role Name: {data.get('name')}")
         print(f"   Description: {data.get('description')}")
-        
+
+def sync_project(project_key, role_id, request_pool):
+    """
+    Adds everyone with some role in the project to role_id, skipping users who
+    already hold it. Role fetches and chunk posts run on request_pool.
+    """
+    print(f"🔍 Scanning users in project '{project_key}'...")
+    try:
+        role_users = get_project_role_users(project_key, request_pool)
     except requests.exceptions.HTTPError as e:
-        print(f"❌ Failed to add users: {e}")
-        print(f"   Response: {e.response.text}")
+        print(f"❌ Could not read roles for {project_key}: {e}")
+        return
+
+    if role_id not in role_users:
+        print(f"❌ Role ID {role_id} not found in project {project_key}")
+        return
+
+    everyone = set()
+    for users in role_users.values():
+        everyone |= users
+    to_add = everyone - role_users[role_id]
+
+    if not everyone:
+        print(f"No users found in project {project_key}.")
+        return
+
+    print(f"Found {len(everyone)} unique users in {project_key}, "
+          f"{len(everyone) - len(to_add)} already in the target role.")
+    if to_add:
+        add_users_to_target_role(project_key, role_id, to_add, request_pool)
+
+def get_all_project_keys():
+    keys = []
+    start_at = 0
+    while True:
+        data = client.get_json("/rest/api/3/project/search",
+                               params={"startAt": start_at, "maxResults": 50})
+        values = data.get("values", [])
+        keys.extend(p["key"] for p in values)
+        if data.get("isLast", True) or not values:
+            break
+        start_at += len(values)
+    return keys
 
 def helper_list_roles(project_key):
     """Run this once to find out which ID belongs to which Role Name"""
     print(f"📋 Listing Roles for {project_key}...")
-    url = f"{BASE_URL}/rest/api/3/project/{project_key}/role"
-    resp = session.get(url)
-    data = resp.json()
+    data = client.get_json(f"/rest/api/3/project/{project_key}/role")
     
     print(f"{'ID':<10} {'Role URL'}")
     print("-" * 60)
@@ -110,18 +158,22 @@ def helper_list_roles(project_key):
         r_id = link.split('/')[-1]
         print(f"{r_id:<10} {name}")
 
+def main():
+    if ALL_PROJECTS:
+        project_keys = get_all_project_keys()
+    else:
+        project_keys = PROJECT_KEYS or [PROJECT_KEY]
+    print(f"Processing {len(project_keys)} project(s)...")
+
+    # Shared pool for role fetches and chunk posts (separate from the per-project pool)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as request_pool:
+        # For each project: 1. find all users currently on it, 2. add the missing ones to the role
+        with ThreadPoolExecutor(max_workers=PROJECT_WORKERS) as project_pool:
+            list(project_pool.map(lambda key: sync_project(key, TARGET_ROLE_ID, request_pool), project_keys))
+
 # --- EXECUTION ---
 if __name__ == "__main__":
     # UNCOMMENT THIS LINE FIRST to find your Role ID, then comment it out
     # helper_list_roles(PROJECT_KEY)
 
-    # 1. Find all users currently on the project
-    users_to_add = get_all_project_users(PROJECT_KEY)
-    
-    if users_to_add:
-        print(f"Found {len(users_to_add)} unique users.")
-        
-        # 2. Add them to the new role
-        add_users_to_target_role(PROJECT_KEY, TARGET_ROLE_ID, users_to_add)
-    else:
-        print("No users found in this project.")
+    main()
@@ -1,6 +1,7 @@
-import requests
-from requests.auth import HTTPBasicAuth
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from jira_client import JiraClient
 
 # --- CONFIGURATION ---
 BASE_URL = ""
@@ -9,72 +10,172 @@ API_TOKEN = ""
 
 SOURCE_GROUP = "AWS Support"  # Copy from here
 DEST_GROUP = "new-year-2026"    # Paste to here
+
+# Batch mode: mirror several (source, destination) pairs in one run. When set,
+# SOURCE_GROUP/DEST_GROUP are ignored. A group used in several pairs is fetched once.
+GROUP_PAIRS = [
+    # ("AWS Support", "new-year-2026"),
+]
+
+# Also remove destination members who aren't in the source (exact mirror).
+# A source with no user accounts is treated as a safety stop, not as "empty the
+# destination": nothing is added or removed for that pair.
+REMOVE_EXTRAS = False
+
+# Concurrent add/remove calls and member page fetches
+# (the shared client paces them against Jira's rate limits)
+MAX_WORKERS = 8
+
+# Members per page (Jira caps /group/member at 50; larger values are clamped server-side)
+GROUP_PAGE_SIZE = 50
 # ---------------------
 
-auth = HTTPBasicAuth(EMAIL, API_TOKEN)
-headers = {"Accept": "application/json", "Content-Type": "application/json"}
+client = JiraClient(BASE_URL, EMAIL, API_TOKEN, pool_size=MAX_WORKERS)
+
+# Member lists already fetched this run, by group name
+_group_users_cache = {}
+
+def fetch_group_page(group_name, start_at):
+    params = {'groupname': group_name, 'startAt': start_at, 'maxResults': GROUP_PAGE_SIZE}
+    return client.request("GET", "/rest/api/3/group/member", params=params)
+
+def fetch_group_users(group_name):
+    """
+    Fetches all user records (accountId, accountType, ...) in a group, or None if
+    the group doesn't exist. Once the first page gives the total, the remaining
+    pages are fetched concurrently. Results are cached for the rest of the run.
+    """
+    if group_name in _group_users_cache:
+        return _group_users_cache[group_name]
 
-def get_group_members(group_name):
-    """Fetches all accountIds from a group."""
-    members = []
-    url = f"{BASE_URL}/rest/api/3/group/member"
-    params = {'groupname': group_name, 'maxResults': 50}
-    
     print(f"📥 Fetching members from '{group_name}'...")
-    while True:
-        resp = requests.get(url, headers=headers, auth=auth, params=params)
-        if resp.status_code == 404:
-            print(f"❌ Group '{group_name}' not found.")
-            sys.exit(1)
-        resp.raise_for_status()
-        data = resp.json()
-        
-        for user in data['values']:
-            if user['accountType'] == 'atlassian': # Skip apps/bots if needed
-                members.append(user['accountId'])
-        
-        if data['isLast']:
-            break
-        params['startAt'] = params.get('startAt', 0) + 50
-        
-    return members
+    resp = fetch_group_page(group_name, 0)
+    if resp.status_code == 404:
+        print(f"❌ Group '{group_name}' not found.")
+        return None
+    resp.raise_for_status()
+    data = resp.json()
+    users = list(data['values'])
+
+    def page_data(start_at):
+        page = fetch_group_page(group_name, start_at)
+        page.raise_for_status()
+        return page.json()
+
+    total = data.get('total')
+    step = data.get('maxResults') or len(data['values']) or GROUP_PAGE_SIZE
+    start_at = len(users)
+    if not data['isLast'] and isinstance(total, int):
+        offsets = list(range(step, total, step))
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            for data in pool.map(page_data, offsets):
+                users.extend(data['values'])
+        start_at = (offsets[-1] + step) if offsets else step
+
+    # No total, or the group grew while we were reading: finish page by page
+    while not data['isLast']:
+        data = page_data(start_at)
+        users.extend(data['values'])
+        start_at += step
+
+    _group_users_cache[group_name] = users
+    return users
 
 def add_user_to_group(account_id, group_name):
     """Adds a single user to a group."""
-    url = f"{BASE_URL}/rest/api/3/group/user"
+    url = "/rest/api/3/group/user"
     params = {'groupname': group_name}
     payload = {'accountId': account_id}
     
-    resp = requests.post(url, headers=headers, auth=auth, params=params, json=payload)
+    resp = client.request("POST", url, params=params, json=payload)
     
     if resp.status_code == 201:
         print(f"  ✅ Added user {account_id}")
+        return True
     elif resp.status_code == 400:
         # Usually means user is already in group
         print(f"  Example: User {account_id} already in group (Skipped)")
     else:
         print(f"  ❌ Failed to add {account_id}: {resp.status_code} {resp.text}")
+    return False
 
-def mirror_groups():
+def remove_user_from_group(account_id, group_name):
+    """Removes a single user from a group."""
+    url = "/rest/api/3/group/user"
+    params = {'groupname': group_name, 'accountId': account_id}
+
+    resp = client.request("DELETE", url, params=params)
+
+    if resp.status_code in (200, 204):
+        print(f"  🗑 Removed user {account_id}")
+        return True
+    print(f"  ❌ Failed to remove {account_id}: {resp.status_code} {resp.text}")
+    return False
+
+def run_for_each(action, account_ids, group_name):
+    """Runs action(account_id, group_name) on a bounded pool; returns the account_ids that succeeded."""
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        results = pool.map(lambda account_id: action(account_id, group_name), account_ids)
+        return [account_id for account_id, ok in zip(account_ids, results) if ok]
+
+def mirror_groups(source_group=SOURCE_GROUP, dest_group=DEST_GROUP):
+    """Mirrors one pair. Returns False if either group doesn't exist."""
     # 1. Get Source Members
-    source_members = get_group_members(SOURCE_GROUP)
+    source_users = fetch_group_users(source_group)
+    if source_users is None:
+        return False
+    source_members = [u['accountId'] for u in source_users if u['accountType'] == 'atlassian']
     print(f"Found {len(source_members)} users in source.")
 
     if not source_members:
-        print("Source group is empty. Exiting.")
-        return
+        # Safety stop: a wrong or emptied source must not wipe the destination
+        print("Source group is empty. Exiting" +
+              (f" without removing anyone from '{dest_group}'." if REMOVE_EXTRAS else "."))
+        return True
 
-    # 2. (Optional) Check if Dest exists, if not, you might need to create it manually 
-    # or handle the 404 in the add loop.
-    
-    print(f"🚀 cloning users to '{DEST_GROUP}'...")
-    
-    count = 0
-    for account_id in source_members:
-        add_user_to_group(account_id, DEST_GROUP)
-        count += 1
-        
-    print(f"\n✨ Operation Complete. Processed {count} users.")
+    # 2. Get Dest Members up front (404 here means the group has to be created first)
+    dest_users = fetch_group_users(dest_group)
+    if dest_users is None:
+        return False
+    dest_members = {u['accountId'] for u in dest_users}
+
+    # 3. Only send the adds that change something
+    to_add = [account_id for account_id in dict.fromkeys(source_members) if account_id not in dest_members]
+    print(f"{len(source_members) - len(to_add)} already in '{dest_group}', {len(to_add)} to add.")
+
+    print(f"🚀 cloning users to '{dest_group}'...")
+    added = run_for_each(add_user_to_group, to_add, dest_group)
+
+    removed = []
+    if REMOVE_EXTRAS:
+        # Anyone in the source (apps/bots included) stays; everyone else goes
+        source_all = {u['accountId'] for u in source_users}
+        to_remove = sorted(dest_members - source_all)
+        print(f"🧹 Removing {len(to_remove)} users not in '{source_group}'...")
+        removed = run_for_each(remove_user_from_group, to_remove, dest_group)
+
+    # Keep the cached destination list true for later pairs that read it
+    by_id = {u['accountId']: u for u in source_users}
+    gone = set(removed)
+    _group_users_cache[dest_group] = (
+        [u for u in dest_users if u['accountId'] not in gone] + [by_id[a] for a in added]
+    )
+
+    print(f"\n✨ Operation Complete. Added {len(added)} of {len(to_add)} users" +
+          (f", removed {len(removed)}." if REMOVE_EXTRAS else "."))
+    return True
+
+def mirror_all():
+    pairs = GROUP_PAIRS or [(SOURCE_GROUP, DEST_GROUP)]
+    failed = []
+    for source_group, dest_group in pairs:
+        print(f"\n=== {source_group} → {dest_group} ===")
+        if not mirror_groups(source_group, dest_group):
+            failed.append((source_group, dest_group))
+
+    if failed:
+        print(f"\n❌ {len(failed)} pair(s) skipped (group not found): {failed}")
+        sys.exit(1)
 
 if __name__ == "__main__":
-    mirror_groups()
+    mirror_all()
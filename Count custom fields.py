@@ -1,46 +1,41 @@
 import sys
 import requests
-from requests.auth import HTTPBasicAuth
+
+from jira_cache import cache_from_argv
+from jira_client import JiraClient
+from jira_fields import DEFAULT_INDEX_PATH, FieldIndex
 
 # --- CONFIGURATION ---
 # Replace the placeholders below with your actual details
 JIRA_URL = ""
 EMAIL = ""
 API_TOKEN = "" 
+
+# Reuse the field list from the local cache (run with --refresh to refetch, --no-cache to bypass)
+USE_CACHE = False
+
+# The catalogue is saved here as a compact field index for the other reports
+# (id -> name, custom flag, schema type, searcher). Empty string = don't save.
+FIELD_INDEX_FILE = DEFAULT_INDEX_PATH
 # ---------------------
 
 def get_custom_fields():
 
-    # Clean the URL just in case
-    jira_url_clean = JIRA_URL.strip().rstrip('/')
+    # The client cleans the URL (strip + trailing slash)
+    client = JiraClient(JIRA_URL, EMAIL, API_TOKEN, cache=cache_from_argv(USE_CACHE))
 
     try:
         # Construct the API endpoint for fields
         # /rest/api/3/field is standard for Cloud, /rest/api/2/field often used for Server
         # We'll use 2 as it is generally compatible with both for fetching fields
-        api_endpoint = f"{jira_url_clean}/rest/api/2/field"
+        api_endpoint = client.url("/rest/api/2/field")
         
         print(f"\nConnecting to {api_endpoint}...")
 
-        headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
-
-        # Make the GET request
-        response = requests.get(
-            api_endpoint,
-            auth=HTTPBasicAuth(EMAIL, API_TOKEN),
-            headers=headers
-        )
-
-        # Check for HTTP errors
-        response.raise_for_status()
-
         print("Fetching fields (this may take a moment)...")
         
-        # Parse JSON response directly
-        all_fields = response.json()
+        # Make the GET request (raises HTTPError on 4xx/5xx) and parse the JSON
+        all_fields = client.get_json(api_endpoint)
         
         custom_field_count = 0
         
@@ -57,6 +52,14 @@ def get_custom_fields():
         print("-" * 60)
         print(f"\nSuccess! Found {custom_field_count} custom fields.")
 
+        if FIELD_INDEX_FILE:
+            index = FieldIndex.from_api(all_fields, client.base_url)
+            index.save(FIELD_INDEX_FILE)
+            duplicates = index.duplicate_names()
+            print(f"Saved field index ({len(index)} fields) to {FIELD_INDEX_FILE}")
+            if duplicates:
+                print(f"Note: {len(duplicates)} field names are used by more than one field.")
+
     except requests.exceptions.HTTPError as e:
         print(f"\nHTTP Error: {e}")
         if e.response.status_code == 401:
@@ -1,7 +1,8 @@
 import requests
-from requests.auth import HTTPBasicAuth
 import json
-import time
+from concurrent.futures import ThreadPoolExecutor
+
+from jira_client import JiraClient
 # =========================
 # CONFIGURATION
 # =========================
@@ -17,33 +18,20 @@ API_TOKEN = ""
 # Pagination for dashboard search
 DASHBOARD_PAGE_SIZE = 100
 
-# Basic retry handling
+# Retries for 429/5xx (backoff and Retry-After handling live in the shared client)
 MAX_RETRIES = 5
-RETRY_SLEEP_SECONDS = 2
+
+# Concurrent gadget fetches (1 = serial). The shared rate limiter still paces the calls.
+MAX_WORKERS = 8
 
 # =========================
 # HTTP HELPERS
 # =========================
-auth = HTTPBasicAuth(EMAIL, API_TOKEN)
-headers = {"Accept": "application/json"}
+client = JiraClient(JIRA_BASE_URL, EMAIL, API_TOKEN, max_retries=MAX_RETRIES, pool_size=MAX_WORKERS)
 
 def request_json(method: str, url: str, params=None):
-    """Simple request wrapper with basic retry for 429/5xx."""
-    for attempt in range(1, MAX_RETRIES + 1):
-        resp = requests.request(method, url, headers=headers, auth=auth, params=params)
-
-        if resp.status_code == 429 or 500 <= resp.status_code <= 599:
-            # Backoff (and respect Retry-After if present)
-            retry_after = resp.headers.get("Retry-After")
-            sleep_s = int(retry_after) if retry_after and retry_after.isdigit() else RETRY_SLEEP_SECONDS * attempt
-            time.sleep(sleep_s)
-            continue
-
-        resp.raise_for_status()
-        return resp.json()
-
-    # If we got here, retries were exhausted
-    resp.raise_for_status()
+    """Rate-limited request with retry for 429/5xx; raises HTTPError once retries run out."""
+    return client.request_json(method, url, params=params)
 
 # =========================
 # JIRA API CALLS
@@ -58,7 +46,7 @@ def fetch_all_dashboards():
     start_at = 0
 
     while True:
-        url = f"{JIRA_BASE_URL}/rest/api/3/dashboard/search"
+        url = "/rest/api/3/dashboard/search"
         params = {
             "startAt": start_at,
             "maxResults": DASHBOARD_PAGE_SIZE,
@@ -88,10 +76,37 @@ def fetch_dashboard_gadgets(dashboard_id: str):
       GET /rest/api/3/dashboard/{dashboardId}/gadget
     Response returns 'gadgets' list with fields like id, moduleKey, color, position, title. :contentReference[oaicite:4]{index=4}
     """
-    url = f"{JIRA_BASE_URL}/rest/api/3/dashboard/{dashboard_id}/gadget"
+    url = f"/rest/api/3/dashboard/{dashboard_id}/gadget"
     data = request_json("GET", url)
     return data.get("gadgets", [])
 
+def fetch_gadgets_tolerant(dashboard_id: str):
+    """
+    Returns (gadgets, None), or (None, http_status) if this dashboard can't be read
+    (e.g. 401/404 when you lack permission), so one bad dashboard doesn't stop the run.
+    """
+    try:
+        return fetch_dashboard_gadgets(dashboard_id), None
+    except requests.HTTPError as e:
+        return None, (e.response.status_code if e.response is not None else "?")
+
+def iter_dashboard_gadgets(dashboards):
+    """
+    Yields (dashboard, gadgets, error_status) in the same order as `dashboards`.
+    Gadget fetches run on a pool of MAX_WORKERS threads.
+    """
+    ids = [str(d.get("id", "")) for d in dashboards]
+    if MAX_WORKERS <= 1:
+        results = map(fetch_gadgets_tolerant, ids)
+        for d, (gadgets, status) in zip(dashboards, results):
+            yield d, gadgets, status
+        return
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        # pool.map yields results in submission order, so output stays deterministic
+        for d, (gadgets, status) in zip(dashboards, pool.map(fetch_gadgets_tolerant, ids)):
+            yield d, gadgets, status
+
 # =========================
 # MAIN
 # =========================
@@ -99,7 +114,7 @@ def main():
     dashboards = fetch_all_dashboards()
     print(f"Found {len(dashboards)} dashboards (that this user can access).\n")
 
-    for d in dashboards:
+    for d, gadgets, error_status in iter_dashboard_gadgets(dashboards):
         dash_id = str(d.get("id", ""))
         dash_name = d.get("name", "")
         owner = d.get("owner") or {}
@@ -109,16 +124,12 @@ def main():
         owner_account_id = owner.get("accountId") if owner else None
         owner_active = owner.get("active") if owner else None
 
-        # Fetch gadgets; if you lack permission for a specific dashboard, this can 401/404.
-        try:
-            gadgets = fetch_dashboard_gadgets(dash_id)
-        except requests.HTTPError as e:
+        # Gadget fetch failed (e.g. 401/404 without permission on this dashboard).
+        if error_status is not None:
             # Don’t crash the whole run—just report and continue
-            status = e.response.status_code if e.response is not None else "?"
-            gadgets = None
             print(f"Dashboard: {dash_name} (ID: {dash_id})")
             print(f"Owner: {owner_display} | accountId={owner_account_id} | active={owner_active}")
-            print(f"Gadgets: <unable to fetch, HTTP {status}>")
+            print(f"Gadgets: <unable to fetch, HTTP {error_status}>")
             print("-" * 80)
             continue
 
@@ -1,7 +1,11 @@
 import requests
-from requests.auth import HTTPBasicAuth
 import json
+import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from jira_client import JiraClient
 
 # --- CONFIGURATION ---
 BASE_URL = ""  # No trailing slash
@@ -13,21 +17,27 @@ DRY_RUN = True
 
 # Protected workflows to NEVER delete (System defaults)
 PROTECTED_WORKFLOWS = ["jira", "Software Simplified Workflow for Project"]
+
+# Deletions in flight at once
+MAX_WORKERS = 8
+
+# Every planned and finished deletion is appended here (JSON Lines). If a run is
+# interrupted, the next run resumes the unfinished plan without rescanning.
+# Delete the file to force a fresh scan.
+JOURNAL_FILE = "workflow_cleanup_journal.jsonl"
 # ---------------------
 
-session = requests.Session()
-session.auth = HTTPBasicAuth(EMAIL, API_TOKEN)
-session.headers = {
-    "Accept": "application/json",
-    "Content-Type": "application/json"
-}
+client = JiraClient(BASE_URL, EMAIL, API_TOKEN, pool_size=MAX_WORKERS)
+
+# Outcomes that need no retry on resume; anything else ("error") is tried again
+FINAL_OUTCOMES = {"deleted", "gone", "in_use"}
 
 def get_workflows():
     """Fetches all workflows with their usage data."""
     print(f"🔄 Scanning workflows on {BASE_URL}...")
     
     # We use the 'search' endpoint and expand schemes/projects to check usage
-    url = f"{BASE_URL}/rest/api/3/workflow/search"
+    url = "/rest/api/3/workflow/search"
     
     all_workflows = []
     start_at = 0
@@ -41,9 +51,7 @@ def get_workflows():
         }
         
         try:
-            resp = session.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
+            data = client.get_json(url, params=params)
         except requests.exceptions.HTTPError as e:
             print(f"❌ Error fetching workflows: {e}")
             sys.exit(1)
@@ -60,40 +68,108 @@ def get_workflows():
             
     return all_workflows
 
+class Journal:
+    """Append-only JSON Lines log of the cleanup plan and its progress (thread-safe)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break  # torn last line from an interrupted write
+        return entries
+
+    def pending(self):
+        """
+        Candidates from the last plan that haven't reached a final outcome,
+        or None if there is no unfinished plan to resume. A plan made against
+        another site is never resumed: its workflow ids mean nothing here.
+        """
+        site = None
+        planned = {}
+        finished = set()
+        complete = False
+        for entry in self.read():
+            event = entry.get("event")
+            if event == "plan":
+                site = entry.get("site")
+                planned, finished, complete = {}, set(), False
+            elif event == "planned":
+                planned[entry["id"]] = entry["name"]
+            elif event in FINAL_OUTCOMES:
+                finished.add(entry["id"])
+            elif event == "complete":
+                complete = True
+        if complete or not planned:
+            return None
+        if site != BASE_URL:
+            print(f"⚠️  Ignoring unfinished cleanup in {self.path}: it was planned for {site or 'an unknown site'}.")
+            return None
+        return [(wf_id, name) for wf_id, name in planned.items() if wf_id not in finished]
+
+    def write(self, event, **fields):
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"event": event, **fields}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def plan(self, candidates):
+        with self._lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"event": "plan", "site": BASE_URL}) + "\n")
+                for wf_id, name in candidates:
+                    f.write(json.dumps({"event": "planned", "id": wf_id, "name": name}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
 def delete_workflow(workflow_id, workflow_name):
-    """Deletes a specific workflow by ID."""
-    url = f"{BASE_URL}/rest/api/3/workflow/{workflow_id}"
+    """
+    Deletes a specific workflow by ID.
+    Returns "dry_run", "deleted", "gone" (already deleted), "in_use" or "error".
+    """
+    url = f"/rest/api/3/workflow/{workflow_id}"
     
     if DRY_RUN:
         print(f"  [DRY RUN] Would DELETE: '{workflow_name}' (ID: {workflow_id})")
-        return True
+        return "dry_run"
 
     try:
-        resp = session.delete(url)
-        if resp.status_code == 204:
-            print(f"  ✅ DELETED: '{workflow_name}'")
-            return True
-        else:
-            print(f"  ❌ Failed to delete '{workflow_name}': {resp.status_code} {resp.text}")
-            return False
-    except requests.exceptions.HTTPError as e:
+        resp = client.request("DELETE", url)
+    except requests.exceptions.RequestException as e:
+        print(f"  ❌ Error deleting '{workflow_name}': {e}")
+        return "error"
+
+    if resp.status_code == 204:
+        print(f"  ✅ DELETED: '{workflow_name}'")
+        return "deleted"
+    if resp.status_code == 404:
+        print(f"  ✅ Already gone: '{workflow_name}'")
+        return "gone"
+    if resp.status_code == 400:
         # 400 Bad Request usually means it's active/in use
-        if e.response.status_code == 400:
-            print(f"  ⚠️ Cannot delete '{workflow_name}': It is still active/assigned.")
-        else:
-            print(f"  ❌ Error deleting '{workflow_name}': {e}")
-        return False
+        print(f"  ⚠️ Cannot delete '{workflow_name}': It is still active/assigned.")
+        return "in_use"
+    print(f"  ❌ Failed to delete '{workflow_name}': {resp.status_code} {resp.text}")
+    return "error"
 
-def clean_workflows():
+def find_inactive_workflows():
+    """Returns [(entityId, name)] for unused, unprotected workflows."""
     workflows = get_workflows()
     print(f"📊 Found {len(workflows)} total workflows.")
-    
-    inactive_count = 0
-    deleted_count = 0
-    
+
     print("\n🔍 Identifying inactive workflows...")
     print("-" * 60)
 
+    candidates = []
     for wf in workflows:
         name = wf.get('id', {}).get('name')
         entity_id = wf.get('id', {}).get('entityId')
@@ -108,13 +184,41 @@ def clean_workflows():
         projects = wf.get('projects', []) # Projects using it directly (rare but possible)
         
         if not schemes and not projects:
-            inactive_count += 1
             print(f"🗑 Candidate: '{name}'")
-            
-            # 3. Perform Deletion
-            success = delete_workflow(entity_id, name)
-            if success and not DRY_RUN:
-                deleted_count += 1
+            candidates.append((entity_id, name))
+
+    return candidates
+
+def clean_workflows():
+    journal = Journal(JOURNAL_FILE)
+
+    resumed = None if DRY_RUN else journal.pending()
+    if resumed is not None:
+        print(f"↩️  Resuming unfinished cleanup from {JOURNAL_FILE}: {len(resumed)} workflows left.")
+        print("-" * 60)
+        candidates = resumed
+    else:
+        candidates = find_inactive_workflows()
+        if not DRY_RUN:
+            journal.plan(candidates)
+
+    inactive_count = len(candidates)
+
+    # 3. Perform Deletion (concurrently; each outcome is journaled as it lands)
+    def delete_and_record(candidate):
+        entity_id, name = candidate
+        outcome = delete_workflow(entity_id, name)
+        if not DRY_RUN:
+            journal.write(outcome, id=entity_id, name=name)
+        return outcome
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        outcomes = list(pool.map(delete_and_record, candidates))
+
+    deleted_count = outcomes.count("deleted")
+    errors = outcomes.count("error")
+    if not DRY_RUN and not errors:
+        journal.write("complete")
     
     print("-" * 60)
     if DRY_RUN:
@@ -122,6 +226,8 @@ def clean_workflows():
         print("   No changes were made. Set DRY_RUN = False in the script to execute.")
     else:
         print(f"🧹 Cleanup Complete. Deleted {deleted_count} inactive workflows.")
+        if errors:
+            print(f"   {errors} deletions failed; run again to retry them (progress is in {JOURNAL_FILE}).")
 
 if __name__ == "__main__":
     clean_workflows()
@@ -1,6 +1,12 @@
-from jira import JIRA
-import requests
+import hashlib
+import json
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from jira_client import JiraClient
 
 # ---------------------
 # CONFIGURATION
@@ -9,34 +15,276 @@ JIRA_URL = ""
 EMAIL = ""
 API_TOKEN = ""
 ISSUE_KEY = ""  # Replace with your issue key
-SAVE_DIR = "attachments"#list your directory full path here 
+SAVE_DIR = "attachments"#list your directory full path here
+
+# Save each issue's files in SAVE_DIR/<issue key>/ instead of straight into SAVE_DIR
+PER_ISSUE_DIRS = False
+
+MAX_WORKERS = 4                # attachments downloaded at the same time
+CHUNK_SIZE = 1024 * 1024       # bytes written per chunk (nothing is held in memory whole)
+DOWNLOAD_RETRIES = 3           # resume attempts after a dropped connection
+
+# Inside the save directory: the manifest (attachment id -> size, sha256, created)
+# and the content-addressed store that holds each distinct file exactly once.
+MANIFEST_NAME = ".manifest.json"
+STORE_NAME = ".store"
+
+# Attachment metadata comes from one REST call (/issue/{key}?fields=attachment).
+# Set to True to read it through the `jira` library instead (pip install jira).
+USE_JIRA_LIBRARY = False
 
 # ---------------------
 # CONNECT TO JIRA
 # ---------------------
-jira = JIRA(server=JIRA_URL, basic_auth=(EMAIL, API_TOKEN))
+# Built on first use, so importing this module does no network I/O
+_client = None
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = JiraClient(JIRA_URL, EMAIL, API_TOKEN, pool_size=MAX_WORKERS)
+    return _client
+
+def get_attachments(issue_key):
+    """
+    Attachment metadata for one issue as dicts (id, filename, content, size, created).
+    """
+    if USE_JIRA_LIBRARY:
+        from jira import JIRA
+        jira = JIRA(server=JIRA_URL, basic_auth=(EMAIL, API_TOKEN))
+        return [
+            {
+                "id": attachment.id,
+                "filename": attachment.filename,
+                "content": attachment.content,
+                "size": getattr(attachment, "size", None),
+                "created": getattr(attachment, "created", None),
+            }
+            for attachment in jira.issue(issue_key).fields.attachment
+        ]
+
+    issue = get_client().get_json(f"/rest/api/3/issue/{issue_key}", params={"fields": "attachment"})
+    return (issue.get("fields") or {}).get("attachment") or []
+
+# ---------------------
+# DOWNLOAD ENGINE
+# ---------------------
+def download_file(file_url, dest_path, part_path, expected_size=None):
+    """
+    Streams file_url to disk in CHUNK_SIZE pieces.
+    Data goes to part_path first and is renamed onto dest_path only when complete,
+    so dest_path never holds a half-written file. A leftover part_path (from a
+    dropped connection or an earlier run) is resumed with an HTTP Range request.
+    Returns (True, None) or (False, reason).
+    """
+    reason = None
+    for _ in range(DOWNLOAD_RETRIES + 1):
+        have = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if expected_size is not None and have > expected_size:
+            os.remove(part_path)
+            have = 0
+
+        headers = {"Accept": "*/*"}
+        if have:
+            headers["Range"] = f"bytes={have}-"
+
+        try:
+            with get_client().request("GET", file_url, headers=headers, stream=True) as response:
+                if response.status_code == 416 and expected_size is not None and have == expected_size:
+                    pass  # the part file is already complete
+                elif response.status_code == 416:
+                    os.remove(part_path)  # part file doesn't match the server copy; start over
+                    reason = "HTTP 416"
+                    continue
+                elif response.status_code in (200, 206):
+                    # 200 means the server ignored the Range header: rewrite from the start
+                    mode = "ab" if response.status_code == 206 else "wb"
+                    with open(part_path, mode) as f:
+                        for chunk in response.iter_content(CHUNK_SIZE):
+                            f.write(chunk)
+                else:
+                    return False, f"HTTP {response.status_code}"
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout) as e:
+            reason = str(e)
+            continue  # keep what we have and resume
+
+        size = os.path.getsize(part_path)
+        if expected_size is not None and size < expected_size:
+            reason = f"short read ({size}/{expected_size} bytes)"
+            continue
+
+        os.replace(part_path, dest_path)
+        return True, None
+
+    return False, reason
+
+# ---------------------
+# MANIFEST & CONTENT-ADDRESSED STORE
+# ---------------------
+def load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(path, manifest):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def blob_path(store_dir, sha256):
+    return os.path.join(store_dir, sha256[:2], sha256)
+
+def link_into_place(blob, dest_path):
+    """
+    Exposes a stored blob under its attachment name (hard link, or a copy where
+    links aren't supported), replacing whatever was there atomically.
+    """
+    tmp = dest_path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(blob, tmp)
+    except OSError:
+        shutil.copyfile(blob, tmp)
+    os.replace(tmp, dest_path)
+
+def is_in_place(blob, dest_path):
+    """
+    True if dest_path already shows the blob's content: the same file (hard link),
+    or, where a copy had to be made, identical bytes.
+    """
+    if not os.path.exists(dest_path) or not os.path.exists(blob):
+        return False
+    if os.path.samefile(blob, dest_path):
+        return True
+    return (os.path.getsize(blob) == os.path.getsize(dest_path)
+            and sha256_file(dest_path) == os.path.basename(blob))
+
+def retire_old_name(save_dir, known, saved_as, blob, owners):
+    """
+    Removes the name an attachment was saved under last time if it now gets a
+    different one (e.g. a same-named attachment appeared since), so the old name
+    isn't left behind. Only a file that still holds this attachment's blob and
+    that no other attachment is saved under is removed.
+    """
+    old = (known or {}).get("saved_as")
+    if not old or old == saved_as or owners.get(old, known) is not known:
+        return
+    old_path = os.path.join(save_dir, old)
+    if is_in_place(blob, old_path):
+        os.remove(old_path)
+
+def fetch_into_store(file_url, part_path, store_dir, expected_size=None):
+    """
+    Downloads one attachment, hashes it and moves it into the store (or drops it
+    if the store already holds identical content). Returns (sha256, None) or (None, reason).
+    """
+    done_path = part_path + ".done"
+    ok, reason = download_file(file_url, done_path, part_path, expected_size)
+    if not ok:
+        return None, reason
+
+    sha256 = sha256_file(done_path)
+    blob = blob_path(store_dir, sha256)
+    if os.path.exists(blob):
+        os.remove(done_path)
+    else:
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        os.replace(done_path, blob)
+    return sha256, None
 
 # ---------------------
 # DOWNLOAD ATTACHMENTS
 # ---------------------
 def download_attachments(issue_key, save_dir="attachments"):
-    issue = jira.issue(issue_key)
-    os.makedirs(save_dir, exist_ok=True)
+    attachments = get_attachments(issue_key)
+    # The manifest and store live in save_dir and are shared by every issue saved there
+    # (that's what makes dedupe pay off); files go in save_dir or, with PER_ISSUE_DIRS,
+    # in save_dir/<issue key>/
+    sub_dir = issue_key if PER_ISSUE_DIRS else ""
+    os.makedirs(os.path.join(save_dir, sub_dir), exist_ok=True)
+
+    manifest_path = os.path.join(save_dir, MANIFEST_NAME)
+    store_dir = os.path.join(save_dir, STORE_NAME)
+    manifest = load_manifest(manifest_path)
+
+    # Which attachment each saved name (relative to save_dir) belongs to
+    owners = {entry["saved_as"]: entry for entry in manifest.values() if entry.get("saved_as")}
+
+    # Attachments sharing a filename in this issue, or with a name another attachment
+    # is already saved under, get their id as a prefix instead of overwriting each other
+    name_counts = {}
+    for attachment in attachments:
+        name_counts[attachment["filename"]] = name_counts.get(attachment["filename"], 0) + 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            futures = {}
+            for attachment in attachments:
+                attachment_id = str(attachment["id"])
+                file_url = attachment["content"]
+                file_name = attachment["filename"]
+                known = manifest.get(attachment_id)
+                owner = owners.get(os.path.join(sub_dir, file_name))
+                if name_counts[file_name] > 1 or (owner is not None and owner is not known):
+                    file_name = f"{attachment_id}_{file_name}"
+                saved_as = os.path.join(sub_dir, file_name)
+                dest_path = os.path.join(save_dir, saved_as)
+                size = attachment.get("size")
+
+                # Already fetched (same id, same size, blob still in the store): no transfer
+                if known and known.get("size") == size and os.path.exists(blob_path(store_dir, known["sha256"])):
+                    blob = blob_path(store_dir, known["sha256"])
+                    if not is_in_place(blob, dest_path):
+                        link_into_place(blob, dest_path)
+                    retire_old_name(save_dir, known, saved_as, blob, owners)
+                    known["saved_as"] = saved_as
+                    print(f"= Already have: {file_name}")
+                    continue
+
+                part_path = os.path.join(save_dir, f".{attachment_id}.part")
+
+                print(f"Downloading: {file_name}...")
+                future = pool.submit(fetch_into_store, file_url, part_path, store_dir, size)
+                futures[future] = (attachment, file_name, saved_as)
 
-    for attachment in issue.fields.attachment:
-        file_url = attachment.content
-        file_name = attachment.filename
+            for future in as_completed(futures):
+                attachment, file_name, saved_as = futures[future]
+                sha256, reason = future.result()
+                if sha256 is None:
+                    print(f"✘ Failed to download: {file_name} ({reason})")
+                    continue
 
-        print(f"Downloading: {file_name}...")
-        response = requests.get(file_url, auth=(EMAIL, API_TOKEN))
-        if response.status_code == 200:
-            with open(os.path.join(save_dir, file_name), 'wb') as f:
-                f.write(response.content)
-            print(f"✔ Saved: {file_name}")
-        else:
-            print(f"✘ Failed to download: {file_name} (HTTP {response.status_code})")
+                link_into_place(blob_path(store_dir, sha256), os.path.join(save_dir, saved_as))
+                known = manifest.get(str(attachment["id"]))
+                if known and known.get("sha256"):
+                    retire_old_name(save_dir, known, saved_as, blob_path(store_dir, known["sha256"]), owners)
+                manifest[str(attachment["id"])] = {
+                    "issue": issue_key,
+                    "filename": attachment["filename"],
+                    "saved_as": saved_as,
+                    "size": attachment.get("size"),
+                    "created": attachment.get("created"),
+                    "sha256": sha256,
+                }
+                print(f"✔ Saved: {file_name}")
+    finally:
+        # Whatever finished is recorded, even if the run is interrupted
+        save_manifest(manifest_path, manifest)
 
 # ---------------------
 # RUN IT
 # ---------------------
-download_attachments(ISSUE_KEY, SAVE_DIR)
+if __name__ == "__main__":
+    download_attachments(ISSUE_KEY, SAVE_DIR)
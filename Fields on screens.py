@@ -1,7 +1,16 @@
-import requests
 import json
-from requests.auth import HTTPBasicAuth
 import csv
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from jira_cache import cache_from_argv
+from jira_client import JiraClient
+from jira_fields import DEFAULT_INDEX_PATH, FieldIndex, load_or_fetch
 
 # --- Configuration ---
 JIRA_BASE_URL = ""
@@ -9,12 +18,28 @@ USERNAME = ""
 API_TOKEN = ""
 OUTPUT_FILE = "jira_screen_export.csv"
 
-HEADERS = {
-    "Accept": "application/json",
-    "Content-Type": "application/json"
-}
+# Cache the screen list on disk between runs (--cache, --refresh, --no-cache override)
+USE_CACHE = False
+
+# Field index written by "Count custom fields.py" (fetched and saved here if missing)
+FIELD_INDEX_FILE = DEFAULT_INDEX_PATH
+
+# Reverse index (field -> screens/tabs, usage counts) built alongside the CSV.
+# Query it later without recrawling:
+#   python "Fields on screens.py" --usage customfield_10010 customfield_10011 ...
+#   python "Fields on screens.py" --usage-file field_ids.txt
+#   python "Fields on screens.py" --unused      (custom fields on no screen)
+USAGE_DB = "jira_screen_field_usage.sqlite"
 
-def get_all_screens(session):
+# --- Concurrency ---
+# Threads for tab lookups and (separately) for per-tab field lookups. 1 = serial crawl.
+MAX_WORKERS = 8
+# Screens allowed in flight ahead of the CSV writer, and rows batches waiting in
+# the writer queue. Both bound memory regardless of the number of screens.
+SCREENS_IN_FLIGHT = 64
+WRITE_QUEUE_SIZE = 256
+
+def get_all_screens(client):
     """
     Fetches the list of all screens (ID and Name).
     """
@@ -24,13 +49,11 @@ def get_all_screens(session):
     max_results = 100
     
     while True:
-        url = f"{JIRA_BASE_URL}/rest/api/3/screens"
+        url = "/rest/api/3/screens"
         params = {"startAt": start_at, "maxResults": max_results}
         
         try:
-            response = session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = client.get_json(url, params=params)
             
             values = data.get('values', data) if isinstance(data, dict) else data
             
@@ -53,92 +76,276 @@ def get_all_screens(session):
     print(f"-> Found {len(screens)} screens.")
     return screens
 
-def get_fields_for_screen(session, screen_id):
+def get_screen_tabs(client, screen_id):
     """
-    1. Gets all Tabs for a screen.
-    2. Gets all Fields for each Tab.
-    Returns a list of dictionaries containing field info.
+    Gets all Tabs for a screen. Returns [] on 404 or any error.
     """
-    all_fields_data = []
-    
-    # Step 1: Get Tabs
-    tabs_url = f"{JIRA_BASE_URL}/rest/api/3/screens/{screen_id}/tabs"
+    tabs_url = f"/rest/api/3/screens/{screen_id}/tabs"
     try:
-        tabs_resp = session.get(tabs_url)
+        tabs_resp = client.request("GET", tabs_url)
         if tabs_resp.status_code == 404:
             return []
         tabs_resp.raise_for_status()
-        tabs = tabs_resp.json()
+        return tabs_resp.json()
     except Exception:
         # Silently fail on tab errors to keep the CSV clean, or print if debugging
         return []
 
-    # Step 2: Get Fields for each Tab
-    for tab in tabs:
-        tab_id = tab['id']
-        tab_name = tab['name']
-        
-        fields_url = f"{JIRA_BASE_URL}/rest/api/3/screens/{screen_id}/tabs/{tab_id}/fields"
-        try:
-            fields_resp = session.get(fields_url)
-            fields_resp.raise_for_status()
-            fields = fields_resp.json()
-            
-            for field in fields:
-                field_id = field.get('id')
-                field_name = field.get('name')
-                
-                # Determine type
-                if field_id.startswith("customfield_"):
-                    f_type = "CUSTOM"
-                else:
-                    f_type = "SYSTEM"
-                
-                all_fields_data.append({
-                    "tab": tab_name,
-                    "field_id": field_id,
-                    "field_name": field_name,
-                    "type": f_type
-                })
-                
-        except Exception:
-            continue
+def get_fields_for_tab(client, screen_id, tab, field_index=None):
+    """
+    Gets all Fields for one Tab.
+    Returns a list of dictionaries containing field info.
+    """
+    tab_fields = []
+    tab_id = tab['id']
+    tab_name = tab['name']
+
+    fields_url = f"/rest/api/3/screens/{screen_id}/tabs/{tab_id}/fields"
+    try:
+        fields = client.get_json(fields_url)
+
+        for field in fields:
+            field_id = field.get('id')
+            field_name = field.get('name')
+
+            # Determine type (from the field index; id prefix only for unknown fields)
+            info = field_index.get(field_id) if field_index is not None else None
+            if info is not None:
+                f_type = "CUSTOM" if info.custom else "SYSTEM"
+            elif field_id.startswith("customfield_"):
+                f_type = "CUSTOM"
+            else:
+                f_type = "SYSTEM"
+
+            tab_fields.append({
+                "tab": tab_name,
+                "field_id": field_id,
+                "field_name": field_name,
+                "type": f_type,
+                "schema": info.schema_type if info is not None else ""
+            })
+
+    except Exception:
+        pass
 
+    return tab_fields
+
+def get_fields_for_screen(client, screen_id, field_index=None):
+    """
+    1. Gets all Tabs for a screen.
+    2. Gets all Fields for each Tab.
+    Returns a list of dictionaries containing field info.
+    """
+    all_fields_data = []
+    for tab in get_screen_tabs(client, screen_id):
+        all_fields_data.extend(get_fields_for_tab(client, screen_id, tab, field_index))
     return all_fields_data
 
+def crawl_screens(client, screens, out_queue, field_index=None):
+    """
+    Concurrent crawler (producer side).
+    Tab lookups run across many screens at once and each screen's tabs fan out to
+    a second pool for the field lookups. Results are put on `out_queue` as
+    (screen, fields_list) in the original screen order, followed by None.
+    """
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as screen_pool, \
+                ThreadPoolExecutor(max_workers=MAX_WORKERS) as tab_pool:
+
+            def screen_job(screen_id):
+                tabs = get_screen_tabs(client, screen_id)
+                return [tab_pool.submit(get_fields_for_tab, client, screen_id, tab, field_index) for tab in tabs]
+
+            def emit(screen, future):
+                fields_list = []
+                for tab_future in future.result():
+                    fields_list.extend(tab_future.result())
+                out_queue.put((screen, fields_list))
+
+            in_flight = deque()
+            for screen in screens:
+                in_flight.append((screen, screen_pool.submit(screen_job, screen['id'])))
+                if len(in_flight) >= SCREENS_IN_FLIGHT:
+                    emit(*in_flight.popleft())
+            while in_flight:
+                emit(*in_flight.popleft())
+    except BaseException as e:
+        out_queue.put(e)
+        return
+    out_queue.put(None)
+
+def iter_screen_fields(client, screens, field_index=None):
+    """
+    Yields (screen, fields_list) in screen order.
+    Serial when MAX_WORKERS <= 1, otherwise fed by crawl_screens through a bounded queue.
+    """
+    if MAX_WORKERS <= 1:
+        for screen in screens:
+            yield screen, get_fields_for_screen(client, screen['id'], field_index)
+        return
+
+    out_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+    producer = threading.Thread(target=crawl_screens, args=(client, screens, out_queue, field_index), daemon=True)
+    producer.start()
+    while True:
+        item = out_queue.get()
+        if item is None:
+            break
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+    producer.join()
+
+# --- Reverse index ---
+USAGE_SCHEMA = """
+CREATE TABLE screens (screen_id TEXT PRIMARY KEY, screen_name TEXT);
+CREATE TABLE placements (field_id TEXT, field_name TEXT, screen_id TEXT, tab_name TEXT);
+CREATE INDEX placements_field ON placements (field_id);
+CREATE VIEW field_usage AS
+    SELECT field_id, MAX(field_name) AS field_name,
+           COUNT(DISTINCT screen_id) AS screens, COUNT(*) AS placements
+    FROM placements GROUP BY field_id;
+"""
+
+class UsageIndexWriter:
+    """
+    Writes the field -> (screen, tab) index to a fresh SQLite file as screens
+    stream in; it replaces `path` only once the crawl has finished (an
+    interrupted run leaves the previous index untouched).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+        self.db = sqlite3.connect(self.tmp_path)
+        self.db.executescript(USAGE_SCHEMA)
+
+    def add_screen(self, screen, fields_list):
+        s_id = str(screen['id'])
+        self.db.execute("INSERT OR REPLACE INTO screens VALUES (?, ?)", (s_id, screen['name']))
+        self.db.executemany(
+            "INSERT INTO placements VALUES (?, ?, ?, ?)",
+            [(item['field_id'], item['field_name'], s_id, item['tab']) for item in fields_list],
+        )
+
+    def finish(self):
+        self.db.commit()
+        self.db.close()
+        os.replace(self.tmp_path, self.path)
+
+def field_usage(db_path, field_ids):
+    """
+    Returns {field_id: [(screen_name, screen_id, tab_name), ...]} for every
+    requested id (an empty list when the field is on no screen), in one query.
+    """
+    usage = {field_id: [] for field_id in field_ids}
+    db = sqlite3.connect(db_path)
+    try:
+        db.execute("CREATE TEMP TABLE wanted (field_id TEXT PRIMARY KEY)")
+        db.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", [(f,) for f in usage])
+        rows = db.execute(
+            """
+            SELECT p.field_id, s.screen_name, p.screen_id, p.tab_name
+            FROM placements p JOIN wanted w ON w.field_id = p.field_id
+            LEFT JOIN screens s ON s.screen_id = p.screen_id
+            ORDER BY p.field_id, s.screen_name, p.tab_name
+            """
+        )
+        for field_id, screen_name, screen_id, tab_name in rows:
+            usage[field_id].append((screen_name, screen_id, tab_name))
+    finally:
+        db.close()
+    return usage
+
+def fields_on_screens(db_path):
+    """Ids of every field placed on at least one screen."""
+    db = sqlite3.connect(db_path)
+    try:
+        return {row[0] for row in db.execute("SELECT DISTINCT field_id FROM placements")}
+    finally:
+        db.close()
+
+def print_usage(usage):
+    for field_id, placements in usage.items():
+        screens = {screen_id for _, screen_id, _ in placements}
+        print(f"{field_id}: {len(screens)} screen(s), {len(placements)} placement(s)")
+        for screen_name, screen_id, tab_name in placements:
+            print(f"    {screen_name} ({screen_id}) / {tab_name}")
+
+def query_usage(args):
+    """Answers --usage / --usage-file / --unused from USAGE_DB without contacting Jira."""
+    if not os.path.exists(USAGE_DB):
+        print(f"{USAGE_DB} not found - run a full scan first.")
+        return
+
+    if args[0] == "--unused":
+        # Same rules as load_or_fetch: an unreadable index or one from another site is no use
+        try:
+            field_index = FieldIndex.load(FIELD_INDEX_FILE)
+        except (OSError, ValueError, KeyError, TypeError):
+            print(f"{FIELD_INDEX_FILE} not found or unreadable - run a full scan first.")
+            return
+        if field_index.site != JIRA_BASE_URL.strip().rstrip("/"):
+            print(f"{FIELD_INDEX_FILE} was built for {field_index.site or 'an unknown site'} - run a full scan first.")
+            return
+        placed = fields_on_screens(USAGE_DB)
+        unused = [f for f in field_index if f.custom and f.id not in placed]
+        for f in sorted(unused, key=lambda f: f.name.lower()):
+            print(f"{f.id:<25} | {f.name}")
+        print(f"\n{len(unused)} custom field(s) are not on any screen.")
+        return
+
+    if args[0] == "--usage-file":
+        with open(args[1], encoding="utf-8") as f:
+            field_ids = [line.strip() for line in f if line.strip()]
+    else:
+        field_ids = args[1:]
+    print_usage(field_usage(USAGE_DB, field_ids))
+
 def main():
-    # 1. Setup Session
-    session = requests.Session()
-    session.auth = HTTPBasicAuth(USERNAME, API_TOKEN)
-    session.headers.update(HEADERS)
+    # 1. Setup Client (pooled session, auth set once; one connection per worker thread)
+    client = JiraClient(
+        JIRA_BASE_URL, USERNAME, API_TOKEN,
+        pool_size=max(1, 2 * MAX_WORKERS),
+        cache=cache_from_argv(USE_CACHE),
+    )
+
+    # 2. Field metadata (saved index; only fetched when missing or from another site)
+    try:
+        field_index = load_or_fetch(client, FIELD_INDEX_FILE)
+    except Exception as e:
+        print(f"Field index unavailable ({e}); typing fields by id prefix.")
+        field_index = None
 
-    # 2. Get Screens
-    screens = get_all_screens(session)
+    # 3. Get Screens
+    screens = get_all_screens(client)
     total_screens = len(screens)
 
     print(f"Starting detailed scan. Writing to {OUTPUT_FILE}...")
 
-    # 3. Open CSV and Iterate
+    # 4. Open CSV and Iterate
     # 'utf-8-sig' ensures Excel opens the CSV with correct special characters
+    usage_index = UsageIndexWriter(USAGE_DB)
     with open(OUTPUT_FILE, mode='w', newline='', encoding='utf-8-sig') as file:
         writer = csv.writer(file)
         
         # Write CSV Header
-        writer.writerow(['Screen Name', 'Screen ID', 'Tab Name', 'Field Type', 'Field Name', 'Field ID'])
+        writer.writerow(['Screen Name', 'Screen ID', 'Tab Name', 'Field Type', 'Field Name', 'Field ID', 'Field Schema'])
 
-        for index, screen in enumerate(screens):
+        # Fetch Fields (rows arrive in screen order, whichever mode is used)
+        for index, (screen, fields_list) in enumerate(iter_screen_fields(client, screens, field_index)):
             s_id = screen['id']
             s_name = screen['name']
             
             # User feedback (Console progress)
             print(f"Processing {index + 1}/{total_screens}: {s_name}...")
-
-            # Fetch Fields
-            fields_list = get_fields_for_screen(session, s_id)
+            usage_index.add_screen(screen, fields_list)
 
             if not fields_list:
                 # Write a row indicating empty screen
-                writer.writerow([s_name, s_id, "N/A", "N/A", "No fields configured", ""])
+                writer.writerow([s_name, s_id, "N/A", "N/A", "No fields configured", "", ""])
             else:
                 for item in fields_list:
                     writer.writerow([
@@ -147,10 +354,16 @@ def main():
                         item['tab'], 
                         item['type'], 
                         item['field_name'], 
-                        item['field_id']
+                        item['field_id'],
+                        item['schema']
                     ])
 
+    usage_index.finish()
     print(f"\nDone! Successfully exported data to {OUTPUT_FILE}")
+    print(f"Field usage index: {USAGE_DB}")
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:] and sys.argv[1] in ("--usage", "--usage-file", "--unused"):
+        query_usage(sys.argv[1:])
+    else:
+        main()
@@ -8,13 +8,15 @@ Requirements:
   pip install requests
 """
 
-import base64
 import json
-from typing import Any, Dict, List, Optional
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import parse_qs, urlparse
 
 import requests
 
+from jira_client import JiraClient
+
 
 # =========================
 # CONFIG – EDIT THESE
@@ -22,63 +24,33 @@ import requests
 JIRA_SITE = ""
 JIRA_EMAIL = ""
 JIRA_API_TOKEN = ""
-# =========================
 
+# True: page through every rule summary once and bucket the rules by their
+# project scope ARIs (one call per 100 rules). Falls back to one query per
+# project when the global listing can't be read or lacks scope information.
+GLOBAL_CRAWL = True
+# =========================
 
-def basic_auth_header(email: str, api_token: str) -> str:
-    token = f"{email}:{api_token}".encode("utf-8")
-    return "Basic " + base64.b64encode(token).decode("utf-8")
-
-
-def request_json(
-    session: requests.Session,
-    method: str,
-    url: str,
-    *,
-    headers: Dict[str, str],
-    params: Optional[Dict[str, Any]] = None,
-    json_body: Optional[Dict[str, Any]] = None,
-    timeout: int = 60,
-) -> Any:
-    response = session.request(
-        method=method,
-        url=url,
-        headers=headers,
-        params=params,
-        json=json_body,
-        timeout=timeout,
-    )
-    if response.status_code >= 400:
-        raise RuntimeError(
-            f"{method} {url} failed ({response.status_code}): {response.text}"
-        )
-    return response.json()
+PROJECT_ARI_RE = re.compile(r"^ari:cloud:jira:[^:]*:project/(\d+)$")
 
 
-def get_cloud_id(session: requests.Session, headers: Dict[str, str]) -> str:
-    url = f"{JIRA_SITE}/_edge/tenant_info"
-    data = request_json(session, "GET", url, headers=headers)
+def get_cloud_id(client: JiraClient) -> str:
+    data = client.get_json("/_edge/tenant_info")
     cloud_id = data.get("cloudId")
     if not cloud_id:
         raise RuntimeError("Unable to determine cloudId")
     return cloud_id
 
 
-def get_all_projects(
-    session: requests.Session, headers: Dict[str, str]
-) -> List[Dict[str, Any]]:
-    url = f"{JIRA_SITE}/rest/api/3/project/search"
+def get_all_projects(client: JiraClient) -> List[Dict[str, Any]]:
+    url = "/rest/api/3/project/search"
     start_at = 0
     max_results = 50
     projects: List[Dict[str, Any]] = []
 
     while True:
-        data = request_json(
-            session,
-            "GET",
-            url,
-            headers=headers,
-            params={"startAt": start_at, "maxResults": max_results},
+        data = client.get_json(
+            url, params={"startAt": start_at, "maxResults": max_results}
         )
 
         projects.extend(data.get("values", []))
@@ -99,51 +71,81 @@ def extract_cursor(link: Optional[str]) -> Optional[str]:
     return qs.get("cursor", [None])[0]
 
 
-def get_project_automation_rules(
-    session: requests.Session,
-    headers: Dict[str, str],
+def iter_rule_summaries(
+    client: JiraClient,
     cloud_id: str,
-    project_id: str,
-) -> List[Dict[str, Any]]:
+    scope_ari: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Pages through rule summaries; every rule on the site when scope_ari is None."""
     url = f"https://api.atlassian.com/automation/public/jira/{cloud_id}/rest/v1/rule/summary"
-    scope_ari = f"ari:cloud:jira:{cloud_id}:project/{project_id}"
-
-    rules: List[Dict[str, Any]] = []
     cursor: Optional[str] = None
 
     while True:
-        payload: Dict[str, Any] = {"scope": scope_ari, "limit": 100}
+        payload: Dict[str, Any] = {"limit": 100}
+        if scope_ari:
+            payload["scope"] = scope_ari
         if cursor:
             payload["cursor"] = cursor
 
-        data = request_json(
-            session,
-            "POST",
-            url,
-            headers=headers,
-            json_body=payload,
-        )
+        data = client.post_json(url, json=payload)
 
-        rules.extend(data.get("data", []))
+        yield from data.get("data", [])
         cursor = extract_cursor(data.get("links", {}).get("next"))
 
         if not cursor:
             break
 
-    return rules
 
+def get_project_automation_rules(
+    client: JiraClient,
+    cloud_id: str,
+    project_id: str,
+) -> List[Dict[str, Any]]:
+    scope_ari = f"ari:cloud:jira:{cloud_id}:project/{project_id}"
+    return list(iter_rule_summaries(client, cloud_id, scope_ari))
+
+
+def get_rules_by_project(
+    client: JiraClient,
+    cloud_id: str,
+) -> Optional[Tuple[Dict[str, List[Dict[str, Any]]], List[Dict[str, Any]]]]:
+    """
+    One crawl of every rule summary, bucketed locally by project scope ARI.
+    Returns (project_id -> rules, rules not scoped to any project), or None if
+    the listing failed or a rule came back without ruleScopeARIs (the caller
+    then falls back to per-project queries).
+    """
+    by_project: Dict[str, List[Dict[str, Any]]] = {}
+    unscoped: List[Dict[str, Any]] = []
+
+    try:
+        for rule in iter_rule_summaries(client, cloud_id):
+            aris = rule.get("ruleScopeARIs")
+            if aris is None:
+                return None
+
+            project_ids = []
+            for ari in aris:
+                m = PROJECT_ARI_RE.match(ari or "")
+                if m:
+                    project_ids.append(m.group(1))
+
+            if not project_ids:
+                unscoped.append(rule)
+            for project_id in project_ids:
+                by_project.setdefault(project_id, []).append(rule)
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ Global rule listing failed ({e}); querying each project instead")
+        return None
 
-def main() -> None:
-    headers = {
-        "Authorization": basic_auth_header(JIRA_EMAIL, JIRA_API_TOKEN),
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-    }
+    return by_project, unscoped
 
-    session = requests.Session()
 
-    cloud_id = get_cloud_id(session, headers)
-    projects = get_all_projects(session, headers)
+def main() -> None:
+    client = JiraClient(JIRA_SITE, JIRA_EMAIL, JIRA_API_TOKEN)
+
+    cloud_id = get_cloud_id(client)
+    projects = get_all_projects(client)
 
     print("=" * 80)
     print(f"Jira site : {JIRA_SITE}")
@@ -151,6 +153,10 @@ def main() -> None:
     print(f"Projects  : {len(projects)}")
     print("=" * 80)
 
+    crawl = get_rules_by_project(client, cloud_id) if GLOBAL_CRAWL else None
+    if crawl is not None:
+        rules_by_project, unscoped_rules = crawl
+
     for project in projects:
         key = project["key"]
         name = project["name"]
@@ -159,12 +165,14 @@ def main() -> None:
         print(f"\n📁 Project: {key} — {name}")
 
         try:
-            rules = get_project_automation_rules(
-                session,
-                headers,
-                cloud_id,
-                project_id,
-            )
+            if crawl is not None:
+                rules = rules_by_project.get(str(project_id), [])
+            else:
+                rules = get_project_automation_rules(
+                    client,
+                    cloud_id,
+                    project_id,
+                )
 
             if not rules:
                 print("  Automation rules: None")
@@ -181,6 +189,15 @@ def main() -> None:
         except Exception as e:
             print(f"  ❌ Error fetching rules: {e}")
 
+    if crawl is not None and unscoped_rules:
+        print(f"\n🌐 Rules not scoped to a single project ({len(unscoped_rules)}):")
+        for r in unscoped_rules:
+            print(
+                f"    - {r.get('name')} "
+                f"[state={r.get('state')}, "
+                f"id={r.get('uuid')}]"
+            )
+
     print("\nDone.")
 
 
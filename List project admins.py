@@ -1,5 +1,28 @@
 import requests
 import getpass
+import csv
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from jira_client import JiraClient
+
+# Results file: .csv for a spreadsheet, .jsonl for one JSON object per line,
+# .json for a single JSON array
+OUTPUT_FILE = "jira_project_admins.csv"
+
+PAGE_SIZE = 50
+# Projects whose roles are checked at the same time
+MAX_WORKERS = 8
+
+RESULT_FIELDS = [
+    "project_key",
+    "project_name",
+    "status",          # ok | no_admins | no_admin_role | error
+    "admin_users",
+    "admin_groups",
+    "error",
+]
 
 def get_user_credentials():
     print("🔐 Enter your Jira Cloud credentials")
@@ -8,48 +31,111 @@ def get_user_credentials():
     api_token = getpass.getpass("Your Jira API token (input hidden): ")
     return base_url, email, api_token
 
-def check_projects_missing_admins(base_url, email, api_token):
-    auth = (email, api_token)
-    headers = {"Accept": "application/json"}
+def iter_projects(client):
+    """Pages through every project (not just the first page of /project/search)."""
+    start_at = 0
+    while True:
+        data = client.get_json("/rest/api/3/project/search",
+                               params={"startAt": start_at, "maxResults": PAGE_SIZE})
+        values = data.get("values", [])
+        yield from values
+        if data.get("isLast", True) or not values:
+            break
+        start_at += len(values)
 
-    # Step 1: Get all projects
-    project_url = f"{base_url}/rest/api/3/project/search"
-    try:
-        project_response = requests.get(project_url, auth=auth, headers=headers)
-        project_response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Error fetching projects: {e}")
-        return
-
-    projects = project_response.json().get("values", [])
-
-    print(f"\n🔍 Checking {len(projects)} project(s) for missing Administrators...\n")
-
-    for project in projects:
-        project_key = project["key"]
-        project_name = project["name"]
+def check_project(client, project):
+    """Checks one project's Administrators role. Always returns a result row."""
+    project_key = project["key"]
+    result = {
+        "project_key": project_key,
+        "project_name": project["name"],
+        "status": "",
+        "admin_users": 0,
+        "admin_groups": 0,
+        "error": "",
+    }
 
+    try:
         # Step 2: Get roles
-        roles_url = f"{base_url}/rest/api/3/project/{project_key}/role"
-        try:
-            roles_response = requests.get(roles_url, auth=auth, headers=headers).json()
-        except:
-            print(f"⚠️  Could not fetch roles for {project_key}")
-            continue
+        roles_response = client.get_json(f"/rest/api/3/project/{project_key}/role")
 
         admin_role_url = roles_response.get("Administrators")
         if not admin_role_url:
-            print(f"⚠️  Project {project_key} ({project_name}) has no 'Administrators' role.")
-            continue
+            result["status"] = "no_admin_role"
+            return result
 
         # Step 3: Check if admin role has users/groups
-        admin_response = requests.get(admin_role_url, auth=auth, headers=headers).json()
-        actors = admin_response.get("actors", [])
+        actors = client.get_json(admin_role_url).get("actors", [])
+    except (requests.exceptions.RequestException, ValueError) as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+        return result
+
+    result["admin_users"] = sum(1 for a in actors if a.get("type") == "atlassian-user-role-actor")
+    result["admin_groups"] = sum(1 for a in actors if a.get("type") == "atlassian-group-role-actor")
+    result["status"] = "ok" if actors else "no_admins"
+    return result
 
-        if not actors:
-            print(f"❌ Project {project_key} ({project_name}) has NO admins assigned.")
+class ResultWriter:
+    """Streams result rows to CSV, JSON Lines or a JSON array (picked from the file extension)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.jsonl = path.lower().endswith(".jsonl")
+        self.json_array = path.lower().endswith(".json")
+        self.rows = 0
+        if self.json_array:
+            self.file.write("[")
+        elif not self.jsonl:
+            self.writer = csv.DictWriter(self.file, fieldnames=RESULT_FIELDS)
+            self.writer.writeheader()
+
+    def write(self, row):
+        if self.jsonl:
+            self.file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        elif self.json_array:
+            # Elements go out one at a time; the closing bracket is written by close()
+            self.file.write(("," if self.rows else "") + "\n  " + json.dumps(row, ensure_ascii=False))
         else:
-            print(f"✅ Project {project_key} ({project_name}) has {len(actors)} admin(s) assigned.")
+            self.writer.writerow(row)
+        self.rows += 1
+        self.file.flush()
+
+    def close(self):
+        if self.json_array:
+            self.file.write("\n]\n" if self.rows else "]\n")
+        self.file.close()
+
+def check_projects_missing_admins(base_url, email, api_token, output_file=OUTPUT_FILE):
+    client = JiraClient(base_url, email, api_token, pool_size=MAX_WORKERS)
+
+    # Step 1: Get all projects (every page)
+    try:
+        projects = list(iter_projects(client))
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error fetching projects: {e}")
+        return
+
+    print(f"\n🔍 Checking {len(projects)} project(s) for missing Administrators → {output_file}\n")
+
+    counts = {}
+    writer = ResultWriter(output_file)
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            # Rows are written in project order as soon as each one is ready
+            for index, result in enumerate(pool.map(lambda p: check_project(client, p), projects), 1):
+                writer.write(result)
+                counts[result["status"]] = counts.get(result["status"], 0) + 1
+                if index % 100 == 0:
+                    print(f"  ...{index}/{len(projects)}", file=sys.stderr)
+    finally:
+        writer.close()
+
+    print(f"✅ with admins: {counts.get('ok', 0)}")
+    print(f"❌ no admins assigned: {counts.get('no_admins', 0)}")
+    print(f"⚠️  no 'Administrators' role: {counts.get('no_admin_role', 0)}")
+    print(f"⚠️  could not check: {counts.get('error', 0)}")
 
 if __name__ == "__main__":
     base_url, email, api_token = get_user_credentials()
@@ -9,11 +9,13 @@ Unused definition:
 
 import sys
 import math
-import requests
 import json
 import csv
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
 
+from jira_client import JiraClient
+
 # =========================
 # CONFIGURATION
 # =========================
@@ -24,6 +26,9 @@ JIRA_API_TOKEN = ""
 
 PAGE_SIZE = 100
 CSV_FILE = "jira_filters.csv"
+
+# Pages after the first are fetched concurrently (1 = serial)
+MAX_WORKERS = 8
 # =========================
 
 
@@ -38,70 +43,77 @@ def parse_dt(dt_str):
     return dt_str  # fall back to raw value
 
 
-def jira_get(session, path, params=None):
-    url = f"{JIRA_BASE_URL}{path}"
-    r = session.get(url, params=params, timeout=60)
-    r.raise_for_status()
-    return r.json()
-
+CSV_FIELDS = ["id", "name", "owner", "approximateLastUsed", "favouritedCount", "jql"]
 
-def main():
-    session = requests.Session()
-    session.auth = (JIRA_EMAIL, JIRA_API_TOKEN)
-    session.headers.update({"Accept": "application/json"})
-
-    rows = []
 
-    first_page = jira_get(
-        session,
+def fetch_filter_page(client, start_at):
+    return client.get_json(
         "/rest/api/3/filter/search",
         params={
-            "startAt": 0,
+            "startAt": start_at,
             "maxResults": PAGE_SIZE,
             # Important: include approximateLastUsed in the expand list
             "expand": "owner,jql,approximateLastUsed",
         },
     )
 
+
+def page_rows(data):
+    return [
+        {
+            "id": f.get("id"),
+            "name": f.get("name", ""),
+            "owner": (f.get("owner") or {}).get("displayName", ""),
+            "approximateLastUsed": parse_dt(f.get("approximateLastUsed")),
+            "favouritedCount": f.get("favouritedCount", 0),
+            "jql": f.get("jql", ""),
+        }
+        for f in data.get("values", [])
+    ]
+
+
+def main():
+    client = JiraClient(JIRA_BASE_URL, JIRA_EMAIL, JIRA_API_TOKEN, pool_size=MAX_WORKERS)
+
+    first_page = fetch_filter_page(client, 0)
+
     total = first_page.get("total", 0)
     pages = max(1, math.ceil(total / PAGE_SIZE))
 
-    def process_page(data):
-        for f in data.get("values", []):
-            rows.append(
-                {
-                    "id": f.get("id"),
-                    "name": f.get("name", ""),
-                    "owner": (f.get("owner") or {}).get("displayName", ""),
-                    "approximateLastUsed": parse_dt(f.get("approximateLastUsed")),
-                    "favouritedCount": f.get("favouritedCount", 0),
-                    "jql": f.get("jql", ""),
-                }
-            )
-
-    process_page(first_page)
-
-    for page in range(1, pages):
-        page_data = jira_get(
-            session,
-            "/rest/api/3/filter/search",
-            params={
-                "startAt": page * PAGE_SIZE,
-                "maxResults": PAGE_SIZE,
-                "expand": "owner,jql,approximateLastUsed",
-            },
-        )
-        process_page(page_data)
+    written = 0
 
     with open(CSV_FILE, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=["id", "name", "owner", "approximateLastUsed", "favouritedCount", "jql"],
-        )
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
         writer.writeheader()
-        writer.writerows(rows)
 
-    print(f"Exported {len(rows)} filters to {CSV_FILE}")
+        # Every page offset is known up front, so pages are fetched concurrently and
+        # parsed as they arrive; out-of-order pages wait here until their turn so the
+        # CSV keeps the same order as a serial run.
+        pending = {0: page_rows(first_page)}
+        next_page = 0
+
+        def flush():
+            nonlocal next_page, written
+            while next_page in pending:
+                rows = pending.pop(next_page)
+                writer.writerows(rows)
+                written += len(rows)
+                next_page += 1
+
+        flush()
+
+        with ThreadPoolExecutor(max_workers=max(1, MAX_WORKERS)) as pool:
+            futures = {
+                pool.submit(fetch_filter_page, client, page * PAGE_SIZE): page
+                for page in range(1, pages)
+            }
+            for future in as_completed(futures):
+                # Drop the future (and the raw page it holds) as soon as its rows are parsed
+                page = futures.pop(future)
+                pending[page] = page_rows(future.result())
+                flush()
+
+    print(f"Exported {written} filters to {CSV_FILE}")
 
 
 if __name__ == "__main__":
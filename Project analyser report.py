@@ -1,9 +1,17 @@
 import requests
 import csv
-import time
-from typing import Any, Dict, List, Optional, Iterable
+import hashlib
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Iterable, Union
 from datetime import datetime, timedelta, timezone
 
+from jira_cache import cache_from_argv
+from jira_client import JiraClient
+
 
 JIRA_BASE_URL = ""
 JIRA_EMAIL = ""
@@ -11,11 +19,25 @@ JIRA_API_TOKEN = ""
 
 OUTPUT_CSV = "jira_project_configuration_report.csv"
 
+# Incremental mode (or pass --incremental): only projects that are new or whose
+# search entry / issue types / workflow scheme changed since the last run are
+# refetched; everything else is merged in from SNAPSHOT_FILE.
+INCREMENTAL = False
+SNAPSHOT_FILE = "jira_project_configuration_snapshot.json"
+
 PAGE_SIZE = 50
-SLEEP_BETWEEN_CALLS = 0.10
 
-AUTH = (JIRA_EMAIL, JIRA_API_TOKEN)
-HEADERS = {"Accept": "application/json", "Content-Type": "application/json"}
+# Priority schemes whose project lists are paged through at the same time
+PRIORITY_SCHEME_WORKERS = 8
+
+# Cache project / scheme metadata on disk between runs (--cache, --refresh, --no-cache override)
+USE_CACHE = False
+
+client = JiraClient(
+    JIRA_BASE_URL, JIRA_EMAIL, JIRA_API_TOKEN,
+    pool_size=PRIORITY_SCHEME_WORKERS,
+    cache=cache_from_argv(USE_CACHE),
+)
 
 CSV_COLUMNS = [
     "Project name",
@@ -28,22 +50,12 @@ CSV_COLUMNS = [
 ]
 
 # ================== HTTP ==================
-def _url(path: str) -> str:
-    return JIRA_BASE_URL.rstrip("/") + (path if path.startswith("/") else "/" + path)
-
-def request_json(method: str, path: str, *, params: Optional[dict] = None) -> Dict[str, Any]:
-    time.sleep(SLEEP_BETWEEN_CALLS)
-    r = requests.request(method, _url(path), auth=AUTH, headers=HEADERS, params=params, timeout=60)
-    if r.status_code >= 400:
+def request_json(method: str, path: str, *, params: Optional[Union[dict, List[tuple]]] = None) -> Dict[str, Any]:
+    # Pacing is adaptive: the client's rate limiter only slows down when Jira asks it to.
+    try:
+        return client.request_json(method, path, params=params) or {}
+    except requests.HTTPError:
         return {}
-    return r.json() if r.text else {}
-
-def get_json_direct(path: str, params_list: List[tuple]) -> Dict[str, Any]:
-    time.sleep(SLEEP_BETWEEN_CALLS)
-    r = requests.get(_url(path), auth=AUTH, headers=HEADERS, params=params_list, timeout=60)
-    if r.status_code >= 400:
-        return {}
-    return r.json() if r.text else {}
 
 def chunk(lst: List[Any], n: int) -> Iterable[List[Any]]:
     for i in range(0, len(lst), n):
@@ -54,8 +66,10 @@ def fetch_projects() -> List[Dict[str, Any]]:
     projects = []
     start_at = 0
     while True:
+        # issueTypes come along for free and feed the change fingerprint
         data = request_json("GET", "/rest/api/3/project/search",
-                            params={"startAt": start_at, "maxResults": PAGE_SIZE})
+                            params={"startAt": start_at, "maxResults": PAGE_SIZE,
+                                    "expand": "issueTypes"})
         values = data.get("values", []) if data else []
         if not values:
             break
@@ -65,21 +79,24 @@ def fetch_projects() -> List[Dict[str, Any]]:
             break
     return projects
 
-def fetch_issue_types_for_project(project_key: str) -> List[tuple[str, str]]:
-    data = request_json("GET", f"/rest/api/3/project/{project_key}",
-                        params={"expand": "issueTypes"})
-    issue_types = data.get("issueTypes", []) if data else []
+def issue_type_pairs(issue_types: List[Dict[str, Any]]) -> List[tuple[str, str]]:
+    """(id, name) per issue type, deduped and sorted by name."""
     out: Dict[str, str] = {}
     for it in issue_types:
         if it.get("id"):
             out[str(it["id"])] = it.get("name", "")
     return sorted(out.items(), key=lambda x: (x[1].lower(), x[0]))
 
+def fetch_issue_types_for_project(project_key: str) -> List[tuple[str, str]]:
+    data = request_json("GET", f"/rest/api/3/project/{project_key}",
+                        params={"expand": "issueTypes"})
+    return issue_type_pairs(data.get("issueTypes", []) if data else [])
+
 def fetch_workflow_scheme_ids(project_ids: List[str]) -> Dict[str, str]:
     out: Dict[str, str] = {}
     for ids in chunk(project_ids, 50):
         params = [("projectId", pid) for pid in ids]
-        data = get_json_direct("/rest/api/3/workflowscheme/project", params)
+        data = request_json("GET", "/rest/api/3/workflowscheme/project", params=params)
         if not data:
             continue
         for item in data.get("values", []) or []:
@@ -131,64 +148,170 @@ def fetch_projects_for_priority_scheme(priority_scheme_id: str) -> set[str]:
     return out
 
 def build_project_to_priority_scheme(project_ids: List[str]) -> Dict[str, str]:
+    """
+    Maps each of `project_ids` to its priority scheme. Schemes are scanned
+    concurrently (a bounded window in scheme order, so the first scheme listing a
+    project still wins) and scanning stops as soon as every project is mapped.
+    """
+    wanted = set(project_ids)
     project_to_scheme: Dict[str, str] = {}
-    schemes = fetch_priority_schemes()
-    for s in schemes:
-        sid = s.get("id")
-        if not sid:
-            continue
-        for pid in fetch_projects_for_priority_scheme(str(sid)):
-            project_to_scheme.setdefault(pid, str(sid))
+    if not wanted:
+        return project_to_scheme
+
+    scheme_ids = iter([str(s["id"]) for s in fetch_priority_schemes() if s.get("id")])
+    window = max(1, PRIORITY_SCHEME_WORKERS) * 2
+
+    with ThreadPoolExecutor(max_workers=max(1, PRIORITY_SCHEME_WORKERS)) as pool:
+        pending: deque = deque()
+
+        def fill() -> None:
+            while len(pending) < window:
+                sid = next(scheme_ids, None)
+                if sid is None:
+                    return
+                pending.append((sid, pool.submit(fetch_projects_for_priority_scheme, sid)))
+
+        fill()
+        while pending and len(project_to_scheme) < len(wanted):
+            sid, future = pending.popleft()
+            for pid in future.result() & wanted:
+                project_to_scheme.setdefault(pid, sid)
+            fill()
+
+        # Everything requested is mapped: drop the schemes still queued
+        for _, future in pending:
+            future.cancel()
+
     return project_to_scheme
 
+# ================== SNAPSHOT ==================
+def project_fingerprint(project: Dict[str, Any], wf_scheme_id: str) -> str:
+    """Cheap change signal: the project search entry plus its workflow scheme assignment."""
+    issue_types = sorted(
+        (str(it.get("id", "")), it.get("name", "")) for it in project.get("issueTypes", []) or []
+    )
+    raw = json.dumps(
+        [
+            project.get("key"),
+            project.get("name"),
+            project.get("projectTypeKey"),
+            project.get("style"),
+            project.get("simplified"),
+            issue_types,
+            wf_scheme_id,
+        ]
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def load_snapshot() -> Dict[str, Any]:
+    try:
+        with open(SNAPSHOT_FILE, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # A snapshot from another site is useless (and wrong) as a baseline
+    if snapshot.get("site") != JIRA_BASE_URL:
+        return {}
+    return snapshot.get("projects", {})
+
+def save_snapshot(projects: Dict[str, Any]) -> None:
+    tmp = SNAPSHOT_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"site": JIRA_BASE_URL, "projects": projects}, f)
+    os.replace(tmp, SNAPSHOT_FILE)
+
+# ================== ROWS ==================
+def build_project_rows(
+    p: Dict[str, Any],
+    wf_scheme_id: str,
+    priority_scheme_id: str,
+    workflow_scheme_cache: Dict[str, Dict[str, Any]],
+) -> List[Dict[str, str]]:
+    pname = p.get("name", "")
+    pkey = p.get("key", "")
+
+    default_workflow = ""
+    issue_type_to_workflow: Dict[str, str] = {}
+
+    if wf_scheme_id:
+        if wf_scheme_id not in workflow_scheme_cache:
+            workflow_scheme_cache[wf_scheme_id] = fetch_workflow_scheme_details(wf_scheme_id)
+        details = workflow_scheme_cache.get(wf_scheme_id, {})
+        default_workflow = details.get("defaultWorkflow", "")
+        issue_type_to_workflow = details.get("issueTypeMappings", {}) or {}
+
+    # The search page already carried the issue types (same data as the fingerprint);
+    # only ask for the project on its own when that list came back empty
+    issue_types = issue_type_pairs(p.get("issueTypes") or []) or fetch_issue_types_for_project(pkey)
+
+    rows: List[Dict[str, str]] = []
+    for itid, itname in issue_types:
+        workflow_name = issue_type_to_workflow.get(itid, default_workflow)
+        rows.append({
+            "Project name": pname,
+            "Project key": pkey,
+            "Work item ID": itid,
+            "Work item name": itname,
+            "Workflow name": workflow_name,
+            "Workflow Scheme ID": wf_scheme_id,
+            "Priority Scheme ID": priority_scheme_id,
+        })
+    return rows
+
 # ================== MAIN ==================
 def main():
+    incremental = INCREMENTAL or "--incremental" in sys.argv[1:]
+
     projects = fetch_projects()
     project_ids = [str(p["id"]) for p in projects if p.get("id")]
 
     project_to_workflow_scheme = fetch_workflow_scheme_ids(project_ids)
-    project_to_priority_scheme = build_project_to_priority_scheme(project_ids)
+
+    previous = load_snapshot() if incremental else {}
+    fingerprints = {
+        str(p["id"]): project_fingerprint(p, project_to_workflow_scheme.get(str(p["id"]), ""))
+        for p in projects if p.get("id")
+    }
+    changed_ids = [
+        pid for pid in project_ids
+        if (previous.get(pid) or {}).get("fingerprint") != fingerprints[pid]
+    ]
+    changed = set(changed_ids)
+
+    project_to_priority_scheme = build_project_to_priority_scheme(changed_ids) if changed_ids else {}
 
     workflow_scheme_cache: Dict[str, Dict[str, Any]] = {}
     rows: List[Dict[str, str]] = []
+    snapshot: Dict[str, Any] = {}
 
     for p in projects:
         pid = str(p.get("id", ""))
-        pname = p.get("name", "")
-        pkey = p.get("key", "")
-
-        wf_scheme_id = project_to_workflow_scheme.get(pid, "")
-        priority_scheme_id = project_to_priority_scheme.get(pid, "")
-
-        default_workflow = ""
-        issue_type_to_workflow: Dict[str, str] = {}
-
-        if wf_scheme_id:
-            if wf_scheme_id not in workflow_scheme_cache:
-                workflow_scheme_cache[wf_scheme_id] = fetch_workflow_scheme_details(wf_scheme_id)
-            details = workflow_scheme_cache.get(wf_scheme_id, {})
-            default_workflow = details.get("defaultWorkflow", "")
-            issue_type_to_workflow = details.get("issueTypeMappings", {}) or {}
-
-        issue_types = fetch_issue_types_for_project(pkey)
-
-        for itid, itname in issue_types:
-            workflow_name = issue_type_to_workflow.get(itid, default_workflow)
-            rows.append({
-                "Project name": pname,
-                "Project key": pkey,
-                "Work item ID": itid,
-                "Work item name": itname,
-                "Workflow name": workflow_name,
-                "Workflow Scheme ID": wf_scheme_id,
-                "Priority Scheme ID": priority_scheme_id,
-            })
+
+        if pid in previous and pid not in changed:
+            # Unchanged since the last run: reuse its rows as-is
+            snapshot[pid] = previous[pid]
+            rows.extend(previous[pid]["rows"])
+            continue
+
+        project_rows = build_project_rows(
+            p,
+            project_to_workflow_scheme.get(pid, ""),
+            project_to_priority_scheme.get(pid, ""),
+            workflow_scheme_cache,
+        )
+        rows.extend(project_rows)
+        if pid:
+            snapshot[pid] = {"fingerprint": fingerprints[pid], "rows": project_rows}
 
     with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
         writer.writeheader()
         writer.writerows(rows)
 
+    save_snapshot(snapshot)
+
+    if incremental:
+        print(f"Refetched {len(changed_ids)} of {len(project_ids)} projects (others merged from {SNAPSHOT_FILE})")
     print(f"Wrote {len(rows)} rows to {OUTPUT_CSV}")
 
 if __name__ == "__main__":
@@ -3,29 +3,30 @@ import csv
 import getpass
 import requests
 import json
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from jira_client import JiraClient
+
+# Projects per search page (also the most rows held in memory at once)
+PAGE_SIZE = 50
+# Concurrent fallback detail fetches for projects without issue types
+MAX_WORKERS = 8
 
 def connect_to_jira(server_url, email, api_token):
     """
     Verifies connection to Jira server using requests.
     """
-    # Ensure URL doesn't end with a slash
-    base_url = server_url.rstrip('/')
-    url = f"{base_url}/rest/api/3/myself"
-    
-    auth = (email, api_token)
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
+    # The client strips the trailing slash and holds a pooled session
+    client = JiraClient(server_url, email, api_token, pool_size=MAX_WORKERS)
     
     try:
-        response = requests.get(url, auth=auth, headers=headers)
+        response = client.request("GET", "/rest/api/3/myself")
         
         if response.status_code == 200:
             user_data = response.json()
             print(f"Successfully connected as: {user_data.get('displayName')}")
-            # Return session details for reuse
-            return {"base_url": base_url, "auth": auth, "headers": headers}
+            # Return the client for reuse
+            return client
         else:
             print(f"\nError connecting to Jira: {response.status_code} - {response.text}")
             return None
@@ -34,86 +35,130 @@ def connect_to_jira(server_url, email, api_token):
         print(f"\nAn unexpected connection error occurred: {e}")
         return None
 
-def get_projects_and_issue_types(session):
+def iter_projects(client, page_size=PAGE_SIZE):
     """
-    Fetches all projects and extracts their associated issue types using REST API.
+    Pages through /rest/api/3/project/search?expand=issueTypes and yields
+    (project, total) as each page arrives, so only one page is held in memory.
+    """
+    start_at = 0
+    while True:
+        data = client.get_json(
+            "/rest/api/3/project/search",
+            params={"startAt": start_at, "maxResults": page_size, "expand": "issueTypes"},
+        )
+        values = data.get("values", [])
+        total = data.get("total", 0)
+        for project in values:
+            yield project, total
+
+        if data.get("isLast", True) or not values:
+            break
+        start_at += len(values)
+
+def fetch_project_issue_types(client, project_key):
+    """
+    Fallback: fetch specific project details when the search entry has no issue types.
     """
-    print("\nFetching projects... (this may take a moment depending on the size of your instance)")
-    
-    project_data = []
-    base_url = session['base_url']
-    auth = session['auth']
-    headers = session['headers']
-    
     try:
-        # Get all projects
-        # We use expand=issueTypes to try and get them in one go, 
-        # though sometimes full detail requires per-project fetching.
-        projects_url = f"{base_url}/rest/api/3/project?expand=issueTypes"
-        response = requests.get(projects_url, auth=auth, headers=headers)
-        
-        if response.status_code != 200:
-            print(f"Error fetching project list: {response.status_code}")
-            return []
+        detail_resp = client.request("GET", f"/rest/api/3/project/{project_key}")
+        if detail_resp.status_code == 200:
+            return detail_resp.json().get('issueTypes', [])
+    except requests.exceptions.RequestException:
+        print(f"Could not retrieve details for project {project_key}")
+    return []
 
-        projects = response.json()
-        total_projects = len(projects)
-        print(f"Found {total_projects} projects. Analyzing issue types...")
+def project_row(project, issue_types_list):
+    # Extract names
+    issue_type_names = [it.get('name') for it in issue_types_list]
 
-        for index, project in enumerate(projects, 1):
-            if index % 10 == 0:
-                print(f"Processing {index}/{total_projects}...")
-            
-            project_key = project.get('key')
-            project_name = project.get('name')
-            
-            # The list endpoint with expand=issueTypes usually provides the data we need.
-            # If issueTypes is missing, we fetch the specific project detail.
-            issue_types_list = project.get('issueTypes', [])
-            
-            if not issue_types_list:
-                # Fallback: Fetch specific project details if not in summary
-                try:
-                    detail_url = f"{base_url}/rest/api/3/project/{project_key}"
-                    detail_resp = requests.get(detail_url, auth=auth, headers=headers)
-                    if detail_resp.status_code == 200:
-                        issue_types_list = detail_resp.json().get('issueTypes', [])
-                except requests.exceptions.RequestException:
-                    print(f"Could not retrieve details for project {project_key}")
-
-            # Extract names
-            issue_type_names = [it.get('name') for it in issue_types_list]
-            
-            # Store the data
-            project_data.append({
-                "Project Name": project_name,
-                "Project Key": project_key,
-                "Issue Types": ", ".join(issue_type_names),
-                "Issue Type Count": len(issue_type_names)
-            })
+    return {
+        "Project Name": project.get('name'),
+        "Project Key": project.get('key'),
+        "Issue Types": ", ".join(issue_type_names),
+        "Issue Type Count": len(issue_type_names)
+    }
+
+def iter_projects_and_issue_types(client):
+    """
+    Streams one row per project, in project order.
+    Projects are read page by page; the per-project fallback detail fetches of a
+    page run on a pool of MAX_WORKERS threads while the rows are yielded in order.
+    """
+    print("\nFetching projects page by page...")
+
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            page = []
+            index = 0
+            for project, total in iter_projects(client):
+                index += 1
+                if index % 10 == 0:
+                    print(f"Processing {index}/{total}...")
+
+                # The search endpoint with expand=issueTypes usually provides the data we need.
+                # If issueTypes is missing, we fetch the specific project detail in the background.
+                issue_types_list = project.get('issueTypes', [])
+                if issue_types_list:
+                    page.append((project, issue_types_list))
+                else:
+                    page.append((project, pool.submit(fetch_project_issue_types, client, project.get('key'))))
+
+                if len(page) >= PAGE_SIZE:
+                    yield from _resolve_page(page)
+                    page = []
+
+            yield from _resolve_page(page)
 
     except requests.exceptions.RequestException as e:
         print(f"Error during API requests: {e}")
 
-    return project_data
+def _resolve_page(page):
+    for project, issue_types in page:
+        if isinstance(issue_types, Future):
+            issue_types = issue_types.result()
+        yield project_row(project, issue_types)
+
+def get_projects_and_issue_types(client):
+    """
+    Fetches all projects and extracts their associated issue types using REST API.
+    """
+    return list(iter_projects_and_issue_types(client))
 
 def save_to_csv(data, filename="jira_project_issue_types.csv"):
     """
     Saves the analyzed data to a CSV file.
+    `data` can be a list or any iterable of rows; rows are written as they come.
+    Returns the number of rows written.
     """
-    if not data:
+    rows = iter(data)
+    first = next(rows, None)
+    if first is None:
         print("No data to save.")
-        return
+        return 0
 
+    count = 0
     try:
-        keys = data[0].keys()
         with open(filename, 'w', newline='', encoding='utf-8') as output_file:
-            dict_writer = csv.DictWriter(output_file, fieldnames=keys)
+            dict_writer = csv.DictWriter(output_file, fieldnames=first.keys())
             dict_writer.writeheader()
-            dict_writer.writerows(data)
+            dict_writer.writerow(first)
+            count = 1
+            for row in rows:
+                dict_writer.writerow(row)
+                count += 1
         print(f"\nReport successfully saved to '{filename}'")
     except IOError as e:
         print(f"Error saving CSV file: {e}")
+    return count
+
+def echo_rows(rows):
+    """
+    Prints each row to the console as it streams past, then passes it on.
+    """
+    for row in rows:
+        display_types = (row['Issue Types'][:40] + '..') if len(row['Issue Types']) > 40 else row['Issue Types']
+        print(f"{row['Project Key']:<10} | {row['Project Name']:<30} | {display_types}")
+        yield row
 
 def main():
     print("--- Jira Project Issue Type Auditor (Requests Version) ---")
@@ -128,21 +173,17 @@ def main():
     api_token = getpass.getpass("API Token: ").strip()
 
     # Execution
-    session = connect_to_jira(server_url, email, api_token)
+    client = connect_to_jira(server_url, email, api_token)
     
-    if session:
-        data = get_projects_and_issue_types(session)
-        
-        if data:
-            # Print summary to console
-            print(f"\n--- Summary ({len(data)} Projects) ---")
-            print(f"{'Key':<10} | {'Project Name':<30} | {'Issue Types'}")
-            print("-" * 80)
-            for row in data:
-                display_types = (row['Issue Types'][:40] + '..') if len(row['Issue Types']) > 40 else row['Issue Types']
-                print(f"{row['Project Key']:<10} | {row['Project Name']:<30} | {display_types}")
-            
-            save_to_csv(data)
+    if client:
+        # Rows are printed and written to the CSV as the pages arrive
+        print("\n--- Projects ---")
+        print(f"{'Key':<10} | {'Project Name':<30} | {'Issue Types'}")
+        print("-" * 80)
+        count = save_to_csv(echo_rows(iter_projects_and_issue_types(client)))
+
+        if count:
+            print(f"--- Summary ({count} Projects) ---")
         else:
             print("No project data found.")
 
@@ -1,7 +1,9 @@
-import base64
+import csv
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Tuple
 
-import requests
+from jira_client import JiraClient
 
 
 # =========================
@@ -11,41 +13,21 @@ JIRA_SITE = ""
 JIRA_EMAIL = ""
 JIRA_API_TOKEN = ""
 
-def headers() -> Dict[str, str]:
-    token = f"{JIRA_EMAIL}:{JIRA_API_TOKEN}".encode()
-    return {
-        "Authorization": "Basic " + base64.b64encode(token).decode(),
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-    }
-
-
-def request_json(
-    session: requests.Session,
-    method: str,
-    url: str,
-    *,
-    params: Optional[Dict[str, Any]] = None,
-    json: Optional[Dict[str, Any]] = None,
-) -> Any:
-    r = session.request(method, url, headers=headers(), params=params, json=json, timeout=60)
-    if r.status_code >= 400:
-        raise RuntimeError(f"{method} {url} failed ({r.status_code}): {r.text}")
-    return r.json()
-
-
-def fetch_workflow_names(session: requests.Session) -> List[str]:
-    url = f"{JIRA_SITE}/rest/api/3/workflows/search"
+# One row per workflow: unreachable statuses, dead ends, strongly connected components
+STRUCTURE_CSV = "workflow_structure_report.csv"
+
+# Workflow detail batches (of WORKFLOW_BATCH_SIZE names) requested at the same time
+MAX_WORKERS = 4
+WORKFLOW_BATCH_SIZE = 50
+
+
+def fetch_workflow_names(client: JiraClient) -> List[str]:
+    url = "/rest/api/3/workflows/search"
     start_at = 0
     names: List[str] = []
 
     while True:
-        data = request_json(
-            session,
-            "GET",
-            url,
-            params={"startAt": start_at, "maxResults": 50},
-        )
+        data = client.get_json(url, params={"startAt": start_at, "maxResults": 50})
 
         for wf in data.get("values", []) or []:
             if wf.get("name"):
@@ -60,20 +42,31 @@ def fetch_workflow_names(session: requests.Session) -> List[str]:
 
 
 def fetch_workflows_and_statuses(
-    session: requests.Session, workflow_names: List[str]
+    client: JiraClient, workflow_names: List[str]
 ) -> Dict[str, Any]:
-    url = f"{JIRA_SITE}/rest/api/3/workflows"
+    url = "/rest/api/3/workflows"
 
     workflows: List[Dict[str, Any]] = []
-    statuses: List[Dict[str, Any]] = []
+    # Every batch repeats the statuses its workflows share; keep one per reference
+    statuses: Dict[str, Dict[str, Any]] = {}
+
+    batches = [
+        workflow_names[i : i + WORKFLOW_BATCH_SIZE]
+        for i in range(0, len(workflow_names), WORKFLOW_BATCH_SIZE)
+    ]
+
+    def fetch_batch(batch: List[str]) -> Dict[str, Any]:
+        return client.post_json(url, json={"workflowNames": batch})
 
-    for i in range(0, len(workflow_names), 50):
-        batch = workflow_names[i : i + 50]
-        data = request_json(session, "POST", url, json={"workflowNames": batch})
-        workflows.extend(data.get("workflows", []) or [])
-        statuses.extend(data.get("statuses", []) or [])
+    with ThreadPoolExecutor(max_workers=max(1, MAX_WORKERS)) as pool:
+        # Batches come back in request order, so the output order is unchanged
+        for data in pool.map(fetch_batch, batches):
+            workflows.extend(data.get("workflows", []) or [])
+            for s in data.get("statuses", []) or []:
+                ref = s.get("statusReference") or s.get("reference") or s.get("id")
+                statuses.setdefault(str(ref), s)
 
-    return {"workflows": workflows, "statuses": statuses}
+    return {"workflows": workflows, "statuses": list(statuses.values())}
 
 
 def build_status_ref_map(statuses: List[Dict[str, Any]]) -> Dict[str, str]:
@@ -111,11 +104,215 @@ def print_workflow(wf: Dict[str, Any], ref_map: Dict[str, str]) -> None:
         print(f"- {tname} -> {to_status}")
 
 
+# =========================
+# GRAPH INDEX
+# =========================
+class WorkflowGraph:
+    """
+    Compact, integer-indexed view of one workflow.
+
+    Status references are interned to 0..n-1 (`refs[i]` maps back). Directed
+    transitions are stored in CSR form: the targets of status i are
+    `targets[offsets[i]:offsets[i + 1]]`. Global transitions (available from
+    every status) are kept once in `global_targets` instead of n edges.
+    """
+
+    __slots__ = ("name", "refs", "start", "offsets", "targets", "global_targets")
+
+    def __init__(self, wf: Dict[str, Any]) -> None:
+        self.name: str = wf.get("name") or "Unnamed workflow"
+        index: Dict[str, int] = {}
+        self.refs: List[str] = []
+
+        def intern(ref: Any) -> int:
+            ref = str(ref)
+            i = index.get(ref)
+            if i is None:
+                i = index[ref] = len(self.refs)
+                self.refs.append(ref)
+            return i
+
+        for st in wf.get("statuses") or []:
+            ref = st.get("statusReference") or st.get("reference") or st.get("id")
+            if ref:
+                intern(ref)
+
+        src = array("i")
+        dst = array("i")
+        global_targets = array("i")
+        self.start: Optional[int] = None
+
+        for t in wf.get("transitions") or []:
+            to_ref = t.get("toStatusReference")
+            if not to_ref:
+                continue
+            to = intern(to_ref)
+            kind = (t.get("type") or "").upper()
+
+            if kind == "INITIAL":
+                self.start = to
+                continue
+
+            from_refs = [link.get("fromStatusReference") for link in t.get("links") or []]
+            from_refs += [f.get("statusReference") if isinstance(f, dict) else f for f in t.get("from") or []]
+            from_refs = [r for r in from_refs if r]
+
+            if kind == "GLOBAL" or not from_refs:
+                global_targets.append(to)
+                continue
+            for ref in from_refs:
+                src.append(intern(ref))
+                dst.append(to)
+
+        n = len(self.refs)
+        # Counting sort of the edges by source status -> CSR arrays
+        self.offsets = array("i", [0]) * (n + 1)
+        for u in src:
+            self.offsets[u + 1] += 1
+        for i in range(n):
+            self.offsets[i + 1] += self.offsets[i]
+        self.targets = array("i", [0]) * len(dst)
+        fill = array("i", self.offsets[:n])
+        for u, v in zip(src, dst):
+            self.targets[fill[u]] = v
+            fill[u] += 1
+        self.global_targets = array("i", sorted(set(global_targets)))
+
+    def __len__(self) -> int:
+        return len(self.refs)
+
+    def successors(self, u: int):
+        yield from self.targets[self.offsets[u]:self.offsets[u + 1]]
+        yield from self.global_targets
+
+    def unreachable(self) -> List[int]:
+        """Statuses no path of transitions reaches from the initial status."""
+        if self.start is None:
+            return []
+        seen = bytearray(len(self))
+        seen[self.start] = 1
+        stack = [self.start]
+        while stack:
+            u = stack.pop()
+            for v in self.successors(u):
+                if not seen[v]:
+                    seen[v] = 1
+                    stack.append(v)
+        return [i for i in range(len(self)) if not seen[i]]
+
+    def dead_ends(self) -> List[int]:
+        """Statuses with no transition leading anywhere else."""
+        out = []
+        for u in range(len(self)):
+            if not any(v != u for v in self.successors(u)):
+                out.append(u)
+        return out
+
+    def strongly_connected_components(self) -> List[List[int]]:
+        """Tarjan's algorithm, iterative (no recursion limit on big workflows)."""
+        n = len(self)
+        order = array("i", [-1]) * n
+        low = array("i", [0]) * n
+        on_stack = bytearray(n)
+        stack: List[int] = []
+        components: List[List[int]] = []
+        counter = 0
+
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            work = [(root, self.successors(root))]
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+
+            while work:
+                u, it = work[-1]
+                advanced = False
+                for v in it:
+                    if order[v] == -1:
+                        order[v] = low[v] = counter
+                        counter += 1
+                        stack.append(v)
+                        on_stack[v] = 1
+                        work.append((v, self.successors(v)))
+                        advanced = True
+                        break
+                    if on_stack[v]:
+                        low[u] = min(low[u], order[v])
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[u])
+                if low[u] == order[u]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = 0
+                        component.append(w)
+                        if w == u:
+                            break
+                    components.append(component)
+
+        return components
+
+
+def analyse_workflows(
+    workflows: List[Dict[str, Any]], ref_map: Dict[str, str]
+) -> List[Dict[str, Any]]:
+    """Structural checks for every workflow in one pass over the graph indexes."""
+    results: List[Dict[str, Any]] = []
+
+    for wf in workflows:
+        g = WorkflowGraph(wf)
+
+        def names(ids: List[int]) -> List[str]:
+            return sorted(ref_map.get(g.refs[i], g.refs[i]) for i in ids)
+
+        components = g.strongly_connected_components()
+        cycles = [c for c in components if len(c) > 1]
+
+        results.append(
+            {
+                "name": g.name,
+                "statuses": len(g),
+                "transitions": len(g.targets) + len(g.global_targets),
+                "start": names([g.start])[0] if g.start is not None else "",
+                "unreachable": names(g.unreachable()),
+                "dead_ends": names(g.dead_ends()),
+                "scc_count": len(components),
+                "largest_scc": max((len(c) for c in components), default=0),
+                "cycles": [names(c) for c in cycles],
+            }
+        )
+
+    return results
+
+
+def write_structure_csv(results: List[Dict[str, Any]], path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["Workflow", "Statuses", "Transitions", "Start status", "Unreachable statuses",
+             "Dead-end statuses", "SCC count", "Largest SCC"]
+        )
+        for r in sorted(results, key=lambda r: r["name"].lower()):
+            writer.writerow(
+                [r["name"], r["statuses"], r["transitions"], r["start"],
+                 "; ".join(r["unreachable"]), "; ".join(r["dead_ends"]),
+                 r["scc_count"], r["largest_scc"]]
+            )
+
+
 def main() -> None:
-    session = requests.Session()
+    client = JiraClient(JIRA_SITE, JIRA_EMAIL, JIRA_API_TOKEN, pool_size=MAX_WORKERS)
 
-    workflow_names = fetch_workflow_names(session)
-    data = fetch_workflows_and_statuses(session, workflow_names)
+    workflow_names = fetch_workflow_names(client)
+    data = fetch_workflows_and_statuses(client, workflow_names)
 
     workflows = data["workflows"]
     statuses = data["statuses"]
@@ -128,6 +325,16 @@ def main() -> None:
     for wf in sorted(workflows, key=lambda w: (w.get("name") or "").lower()):
         print_workflow(wf, ref_map)
 
+    results = analyse_workflows(workflows, ref_map)
+    write_structure_csv(results, STRUCTURE_CSV)
+
+    with_unreachable = sum(1 for r in results if r["unreachable"])
+    with_dead_ends = sum(1 for r in results if r["dead_ends"])
+    print("\n" + "=" * 50)
+    print(f"Workflows with unreachable statuses: {with_unreachable}")
+    print(f"Workflows with dead-end statuses   : {with_dead_ends}")
+    print(f"Structure report                   : {STRUCTURE_CSV}")
+
     print("\nDone.")
 
 
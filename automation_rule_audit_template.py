@@ -1,63 +1,61 @@
-import requests
 import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from jira_client import JiraClient
 
 url = "https://api.atlassian.com/automation/public/{product}/{cloudid}/rest/v1/rule/summary"
 
 ATLASSIAN_USER =""
 ATLASSIAN_API_TOKEN = ""
 
-headers = {
-  "Accept": "application/json"
-}
+MAX_WORKERS = 8  # rule details fetched at the same time
 
-response = requests.request(
-   "GET",
-   url,
-   auth=(ATLASSIAN_USER, ATLASSIAN_API_TOKEN),
-   headers={"Accept": "application/json"}
-)
+client = JiraClient("https://api.atlassian.com", ATLASSIAN_USER, ATLASSIAN_API_TOKEN, pool_size=MAX_WORKERS)
 
-json_response = json.loads(response.text)
+json_response = client.get_json(url)
 
 while json_response['links']['next'] is not None:
     next_url = url + json_response['links']['next']
-    response = requests.request(
-       "GET",
-       next_url,
-       auth=(ATLASSIAN_USER, ATLASSIAN_API_TOKEN),
-       headers={"Accept": "application/json"}
-    )
-    json_response_page = json.loads(response.text)
+    json_response_page = client.get_json(next_url)
     json_response['data'].extend(json_response_page['data'])
     json_response['links']['next'] = json_response_page['links']['next']
 
 print(len(json_response['data']))
 
-components_list = []  # accumulate all components here
-
-for rule in json_response['data']:
-    if rule['description'] == '' and rule['state'] == 'ENABLED':
-        ruleUuid = rule['uuid']
-
-        url = f"https://api.atlassian.com/automation/public/{product}/{cloudid}/rest/v1/rule/{ruleUuid}"
-
-        headers = {
-        "Accept": "application/json"
-        }
-
-        response = requests.request(
-        "GET",
-        url,
-        auth=(ATLASSIAN_USER, ATLASSIAN_API_TOKEN),
-        headers={"Accept": "application/json"}
-        )
-
-        components = json.loads(response.text)['rule']
-
-        components_list.append(components)  # collect the page's components
-
-# save accumulated components to a JSON file
-output_path = r'YOUR_PATH\components.json'
-with open(output_path, "w", encoding="utf-8") as f:
-    json.dump(components_list, f, indent=2, ensure_ascii=False)
-print(f"Saved {len(components_list)} items to {output_path}")
\ No newline at end of file
+def fetch_rule(ruleUuid):
+    url = f"https://api.atlassian.com/automation/public/{product}/{cloudid}/rest/v1/rule/{ruleUuid}"
+    return client.get_json(url)['rule']
+
+# one rule per line, written as soon as it arrives; at most WINDOW requests are
+# in flight and each result is dropped once written, so memory stays flat
+WINDOW = MAX_WORKERS * 2
+output_path = r'YOUR_PATH\components.jsonl'
+saved = 0
+failed = 0
+rule_uuids = (
+    rule['uuid']
+    for rule in json_response['data']
+    if rule['description'] == '' and rule['state'] == 'ENABLED'
+)
+with open(output_path, "w", encoding="utf-8") as f, ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+    in_flight = {}
+    while True:
+        for ruleUuid in rule_uuids:
+            in_flight[pool.submit(fetch_rule, ruleUuid)] = ruleUuid
+            if len(in_flight) >= WINDOW:
+                break
+        if not in_flight:
+            break
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            ruleUuid = in_flight.pop(future)
+            try:
+                f.write(json.dumps(future.result(), ensure_ascii=False) + "\n")
+                saved += 1
+            except Exception as e:
+                print(f"Error fetching rule {ruleUuid}: {e}")
+                failed += 1
+        f.flush()
+print(f"Saved {saved} items to {output_path}")
+if failed:
+    print(f"{failed} rules could not be fetched")
\ No newline at end of file
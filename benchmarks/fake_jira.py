@@ -0,0 +1,848 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Jira Cloud site, for benchmarking the scripts offline.
+
+- Generates a synthetic site of configurable size: projects (issue types,
+  roles), users and groups, fields, screens/tabs, workflows and schemes,
+  priority schemes, filters, dashboards/gadgets, automation rules,
+  permission schemes and one issue with attachments
+- Everything is derived from the object's index, so a large site costs no
+  memory until it is requested; only writes (role/group adds, workflow
+  deletes) are kept, and reset() forgets them
+- Serves the REST endpoints the scripts call, with Jira-style paging
+  (startAt/maxResults/total/isLast, or cursors for automation rules) and a
+  cap on page size like the real API
+- Optional per-request latency and injected 429s (Retry-After), and
+  counters for requests, throttled requests and requests per route
+
+Standalone:
+  python benchmarks/fake_jira.py --size medium --port 8080 --latency 0.05
+
+In code:
+  from fake_jira import FakeJira, FakeSite
+
+  server = FakeJira(FakeSite.preset("small"), latency=0.02)
+  url = server.start()
+  ...
+  print(server.request_count)
+  server.stop()
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+CLOUD_ID = "00000000-0000-4000-8000-000000000000"
+
+ISSUE_TYPES = [
+    ("10001", "Task"),
+    ("10002", "Bug"),
+    ("10003", "Story"),
+    ("10004", "Epic"),
+    ("10005", "Sub-task"),
+]
+ROLE_NAMES = ["Administrators", "Developers", "Users", "Viewers", "Service Desk Team", "Approvers"]
+SYSTEM_FIELDS = [
+    ("summary", "Summary", "string"),
+    ("description", "Description", "string"),
+    ("issuetype", "Issue Type", "issuetype"),
+    ("priority", "Priority", "priority"),
+    ("assignee", "Assignee", "user"),
+    ("reporter", "Reporter", "user"),
+    ("labels", "Labels", "array"),
+    ("duedate", "Due date", "date"),
+    ("components", "Components", "array"),
+    ("fixVersions", "Fix versions", "array"),
+]
+PERMISSION_KEYS = ["BROWSE_PROJECTS", "CREATE_ISSUES", "EDIT_ISSUES", "ASSIGN_ISSUES", "ADD_COMMENTS", "ADMINISTER_PROJECTS"]
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeSite:
+    """Sizes of the generated site; objects are built on request from their index."""
+
+    PRESETS: Dict[str, Dict[str, int]] = {
+        "small": dict(projects=50, users=200, groups=10, members_per_group=60, fields=150,
+                      screens=40, workflows=30, filters=300, dashboards=60, rules=80,
+                      attachments=5),
+        "medium": dict(projects=500, users=2000, groups=50, members_per_group=400, fields=1000,
+                       screens=300, workflows=200, filters=3000, dashboards=500, rules=800,
+                       attachments=20),
+        "large": dict(projects=3000, users=20000, groups=200, members_per_group=3000, fields=5000,
+                      screens=2000, workflows=1000, filters=20000, dashboards=3000, rules=5000,
+                      attachments=50),
+    }
+
+    def __init__(
+        self,
+        *,
+        projects: int = 50,
+        users: int = 200,
+        roles_per_project: int = 4,
+        users_per_role: int = 8,
+        groups: int = 10,
+        members_per_group: int = 60,
+        fields: int = 150,
+        screens: int = 40,
+        tabs_per_screen: int = 2,
+        fields_per_tab: int = 12,
+        workflows: int = 30,
+        statuses: int = 60,
+        statuses_per_workflow: int = 6,
+        workflow_schemes: int = 20,
+        priority_schemes: int = 5,
+        filters: int = 300,
+        dashboards: int = 60,
+        gadgets_per_dashboard: int = 4,
+        rules: int = 80,
+        rule_components: int = 20,
+        permission_schemes: int = 10,
+        attachments: int = 5,
+        attachment_size: int = 64 * 1024,
+        max_page_size: int = 100,
+    ) -> None:
+        self.projects = projects
+        self.users = max(1, users)
+        self.roles_per_project = max(1, min(roles_per_project, len(ROLE_NAMES)))
+        self.users_per_role = users_per_role
+        self.groups = groups
+        self.members_per_group = members_per_group
+        self.fields = max(len(SYSTEM_FIELDS), fields)
+        self.screens = screens
+        self.tabs_per_screen = tabs_per_screen
+        self.fields_per_tab = fields_per_tab
+        self.workflows = workflows
+        self.statuses = max(2, statuses)
+        self.statuses_per_workflow = max(2, min(statuses_per_workflow, self.statuses))
+        self.workflow_schemes = max(1, workflow_schemes)
+        self.priority_schemes = max(1, priority_schemes)
+        self.filters = filters
+        self.dashboards = dashboards
+        self.gadgets_per_dashboard = gadgets_per_dashboard
+        self.rules = rules
+        self.rule_components = rule_components
+        self.permission_schemes = permission_schemes
+        self.attachments = attachments
+        self.attachment_size = attachment_size
+        self.max_page_size = max_page_size
+
+    @classmethod
+    def preset(cls, name: str, **overrides: int) -> "FakeSite":
+        return cls(**{**cls.PRESETS[name], **overrides})
+
+    # ---- users, projects, roles, groups ----
+    def account_id(self, n: int) -> str:
+        return f"user-{n % self.users:06d}"
+
+    def user(self, n: int) -> Dict[str, Any]:
+        n %= self.users
+        return {
+            "accountId": self.account_id(n),
+            "accountType": "app" if n % 20 == 19 else "atlassian",
+            "displayName": f"User {n}",
+            "active": n % 15 != 14,
+        }
+
+    def project(self, i: int, issue_types: bool = False) -> Dict[str, Any]:
+        p = {
+            "id": str(10000 + i),
+            "key": f"P{i}",
+            "name": f"Project {i}",
+            "projectTypeKey": "software",
+            "style": "classic",
+            "simplified": False,
+        }
+        if issue_types:
+            p["issueTypes"] = [
+                {"id": itid, "name": name, "subtask": name == "Sub-task"}
+                for itid, name in ISSUE_TYPES[: 3 + i % 3]
+            ]
+        return p
+
+    def project_index(self, key_or_id: str) -> Optional[int]:
+        if key_or_id.startswith("P") and key_or_id[1:].isdigit():
+            i = int(key_or_id[1:])
+        elif key_or_id.isdigit():
+            i = int(key_or_id) - 10000
+        else:
+            return None
+        return i if 0 <= i < self.projects else None
+
+    def role_ids(self) -> List[int]:
+        return [10000 + j for j in range(self.roles_per_project)]
+
+    def role_users(self, i: int, j: int) -> List[str]:
+        if ROLE_NAMES[j] == "Administrators" and i % 10 == 9:
+            return []  # some projects have nobody in the admin role
+        return [self.account_id(i * 31 + j * 7 + k * 13) for k in range(self.users_per_role)]
+
+    def group_name(self, g: int) -> str:
+        return f"group-{g}"
+
+    def group_members(self, g: int) -> List[Dict[str, Any]]:
+        return [self.user(g * 17 + k) for k in range(min(self.members_per_group, self.users))]
+
+    # ---- fields and screens ----
+    def field(self, k: int) -> Dict[str, Any]:
+        if k < len(SYSTEM_FIELDS):
+            fid, name, schema_type = SYSTEM_FIELDS[k]
+            return {"id": fid, "key": fid, "name": name, "custom": False,
+                    "schema": {"type": schema_type, "system": fid}}
+        c = k - len(SYSTEM_FIELDS)
+        # Roughly one name in ten is reused, as on long-lived sites
+        name = f"Custom field {c % max(1, (self.fields * 9) // 10)}"
+        return {
+            "id": f"customfield_{10000 + c}",
+            "key": f"customfield_{10000 + c}",
+            "name": name,
+            "custom": True,
+            "schema": {"type": "string", "custom": "com.atlassian.jira.plugin.system.customfieldtypes:textfield",
+                       "customId": 10000 + c},
+            "searcherKey": "com.atlassian.jira.plugin.system.customfieldtypes:textsearcher",
+        }
+
+    def tab_fields(self, s: int, t: int) -> List[Dict[str, Any]]:
+        seen = []
+        for k in range(self.fields_per_tab):
+            f = self.field((s * 5 + t * 3 + k * 7) % self.fields)
+            if all(f["id"] != x["id"] for x in seen):
+                seen.append({"id": f["id"], "name": f["name"]})
+        return seen
+
+    # ---- workflows ----
+    def workflow_name(self, w: int) -> str:
+        return "jira" if w == 0 else f"Workflow {w}"
+
+    def workflow_status_refs(self, w: int) -> List[str]:
+        return [f"status-{(w * 3 + k) % self.statuses}" for k in range(self.statuses_per_workflow)]
+
+    def status(self, ref: str) -> Dict[str, Any]:
+        n = int(ref.rsplit("-", 1)[1])
+        category = "TODO" if n % 3 == 0 else ("IN_PROGRESS" if n % 3 == 1 else "DONE")
+        return {"id": str(n + 1), "statusReference": ref, "name": f"Status {n}", "statusCategory": category}
+
+    def workflow(self, w: int) -> Dict[str, Any]:
+        refs = self.workflow_status_refs(w)
+        transitions = [{"id": "1", "name": "Create", "type": "INITIAL", "toStatusReference": refs[0], "links": []}]
+        for k in range(len(refs) - 1):
+            transitions.append({
+                "id": str(11 + k), "name": f"To {refs[k + 1]}", "type": "DIRECTED",
+                "toStatusReference": refs[k + 1], "links": [{"fromStatusReference": refs[k]}],
+            })
+        transitions.append({
+            "id": "91", "name": "Reopen", "type": "DIRECTED", "toStatusReference": refs[0],
+            "links": [{"fromStatusReference": refs[-1]}],
+        })
+        if w % 4 == 0:
+            transitions.append({"id": "99", "name": "Cancel", "type": "GLOBAL",
+                                "toStatusReference": refs[-1], "links": []})
+        return {
+            "id": f"wf-{w}",
+            "name": self.workflow_name(w),
+            "statuses": [{"statusReference": ref} for ref in refs],
+            "transitions": transitions,
+        }
+
+    def workflow_in_use(self, w: int) -> bool:
+        return w % 3 != 2
+
+    def workflow_scheme_id(self, i: int) -> str:
+        return str(20000 + i % self.workflow_schemes)
+
+    def workflow_scheme(self, sid: int) -> Dict[str, Any]:
+        s = sid - 20000
+        return {
+            "id": sid,
+            "name": f"Workflow scheme {s}",
+            "defaultWorkflow": self.workflow_name((s * 3) % max(1, self.workflows)),
+            "issueTypeMappings": {"10002": self.workflow_name((s * 3 + 1) % max(1, self.workflows))},
+        }
+
+    # ---- filters, dashboards, rules ----
+    def filter(self, n: int) -> Dict[str, Any]:
+        last_used = None if n % 4 == 3 else (EPOCH + timedelta(days=n % 700)).strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+        return {
+            "id": str(10000 + n),
+            "name": f"Filter {n}",
+            "owner": {"accountId": self.account_id(n), "displayName": f"User {n % self.users}"},
+            "jql": f"project = P{n % max(1, self.projects)} AND status != Done ORDER BY created DESC",
+            "approximateLastUsed": last_used,
+            "favouritedCount": n % 5,
+        }
+
+    def dashboard(self, n: int) -> Dict[str, Any]:
+        return {
+            "id": str(10000 + n),
+            "name": f"Dashboard {n}",
+            "owner": {"accountId": self.account_id(n), "displayName": f"User {n % self.users}",
+                      "active": n % 15 != 14},
+        }
+
+    def rule_scope(self, n: int) -> List[str]:
+        if n % 10 == 9:
+            return [f"ari:cloud:jira::site/{CLOUD_ID}"]
+        # Rules cluster on a tenth of the projects; most projects have none
+        busy = max(1, self.projects // 10)
+        return [f"ari:cloud:jira:{CLOUD_ID}:project/{10000 + (n * 7) % busy}"]
+
+    def rule_summary(self, n: int) -> Dict[str, Any]:
+        return {
+            "uuid": f"rule-{n:06d}",
+            "name": f"Rule {n}",
+            "state": "DISABLED" if n % 6 == 5 else "ENABLED",
+            "description": "" if n % 2 == 0 else f"Does thing {n}",
+            "ruleScopeARIs": self.rule_scope(n),
+        }
+
+    def rule(self, n: int) -> Dict[str, Any]:
+        rule = self.rule_summary(n)
+        rule["trigger"] = {"component": "TRIGGER", "type": "jira.issue.event.trigger:created", "value": {}}
+        rule["components"] = [
+            {"component": "ACTION", "type": "jira.issue.edit", "value": {"field": f"customfield_{10000 + k}", "text": "x" * 40}}
+            for k in range(self.rule_components)
+        ]
+        return rule
+
+    def permission_grants(self, s: int) -> List[Dict[str, Any]]:
+        grants = []
+        for k, key in enumerate(PERMISSION_KEYS):
+            grants.append({"id": s * 100 + k * 3, "permission": key,
+                           "holder": {"type": "projectRole", "parameter": "10001"}})
+            grants.append({"id": s * 100 + k * 3 + 1, "permission": key,
+                           "holder": {"type": "group", "parameter": self.group_name(k % max(1, self.groups))}})
+            if s % 4 == 3 and key == "BROWSE_PROJECTS":
+                grants.append({"id": s * 100 + k * 3 + 2, "permission": key, "holder": {"type": "anyone"}})
+        return grants
+
+    def attachment_bytes(self, a: int) -> bytes:
+        size = self.attachment_size + a * 17
+        block = f"attachment {a} ".encode()
+        return (block * (size // len(block) + 1))[:size]
+
+
+def page(items: Callable[[int], Any], total: int, start_at: int, max_results: int) -> Dict[str, Any]:
+    """Jira-style offset page over items(0..total-1)."""
+    start_at = max(0, start_at)
+    end = min(total, start_at + max_results)
+    values = [items(n) for n in range(start_at, end)]
+    return {"startAt": start_at, "maxResults": max_results, "total": total,
+            "isLast": end >= total, "values": values}
+
+
+class Reply:
+    def __init__(self, status: int = 200, data: Any = None, *, body: Optional[bytes] = None,
+                 headers: Optional[Dict[str, str]] = None) -> None:
+        self.status = status
+        self.body = body if body is not None else (b"" if data is None else json.dumps(data).encode())
+        self.headers = headers or {}
+        if body is None and data is not None:
+            self.headers.setdefault("Content-Type", "application/json")
+
+
+class FakeJira:
+    """
+    HTTP server for a FakeSite. latency is added to every request (seconds);
+    throttle_every=N answers every Nth request with 429 + Retry-After.
+    """
+
+    def __init__(
+        self,
+        site: FakeSite,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        throttle_every: int = 0,
+        retry_after: float = 1.0,
+    ) -> None:
+        self.site = site
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self.reset()
+
+        self.routes: List[Tuple[str, "re.Pattern[str]", Callable[..., Reply]]] = [
+            (m, re.compile(p + "$"), fn) for m, p, fn in [
+                ("GET", r"/rest/api/3/myself", self.myself),
+                ("GET", r"/_edge/tenant_info", self.tenant_info),
+                ("GET", r"/rest/api/3/project/search", self.project_search),
+                ("GET", r"/rest/api/3/project/(?P<key>[^/]+)", self.project_detail),
+                ("GET", r"/rest/api/3/project/(?P<key>[^/]+)/role", self.project_roles),
+                ("GET", r"/rest/api/3/project/(?P<key>[^/]+)/role/(?P<rid>\d+)", self.project_role),
+                ("POST", r"/rest/api/3/project/(?P<key>[^/]+)/role/(?P<rid>\d+)", self.add_role_actors),
+                ("GET", r"/rest/api/3/group/member", self.group_member),
+                ("POST", r"/rest/api/3/group/user", self.group_add),
+                ("DELETE", r"/rest/api/3/group/user", self.group_remove),
+                ("GET", r"/rest/api/[23]/field", self.field_list),
+                ("GET", r"/rest/api/3/screens", self.screen_list),
+                ("GET", r"/rest/api/3/screens/(?P<sid>\d+)/tabs", self.screen_tabs),
+                ("GET", r"/rest/api/3/screens/(?P<sid>\d+)/tabs/(?P<tid>\d+)/fields", self.tab_field_list),
+                ("GET", r"/rest/api/3/workflows/search", self.workflows_search),
+                ("POST", r"/rest/api/3/workflows", self.workflows_read),
+                ("GET", r"/rest/api/3/workflow/search", self.workflow_search),
+                ("DELETE", r"/rest/api/3/workflow/(?P<wid>[^/]+)", self.workflow_delete),
+                ("GET", r"/rest/api/3/workflowscheme/project", self.workflow_scheme_projects),
+                ("GET", r"/rest/api/3/workflowscheme/(?P<sid>\d+)", self.workflow_scheme_detail),
+                ("GET", r"/rest/api/3/priorityscheme", self.priority_scheme_list),
+                ("GET", r"/rest/api/3/priorityscheme/(?P<sid>\d+)/projects", self.priority_scheme_projects),
+                ("GET", r"/rest/api/3/filter/search", self.filter_search),
+                ("GET", r"/rest/api/3/dashboard/search", self.dashboard_search),
+                ("GET", r"/rest/api/3/dashboard/(?P<did>\d+)/gadget", self.dashboard_gadgets),
+                ("GET", r"/rest/api/3/permissionscheme", self.permission_scheme_list),
+                ("GET", r"/rest/api/3/permissionscheme/(?P<sid>\d+)/permission", self.permission_scheme_grants),
+                ("GET", r"/rest/api/3/issue/(?P<key>[^/]+)", self.issue),
+                ("GET", r"/rest/api/3/attachment/content/(?P<aid>\d+)", self.attachment_content),
+                ("POST", r"/automation/public/jira/(?P<cloud>[^/]+)/rest/v1/rule/summary", self.rule_summaries),
+                ("GET", r"/automation/public/jira/(?P<cloud>[^/]+)/rest/v1/rule/summary", self.rule_summaries),
+                ("GET", r"/automation/public/jira/(?P<cloud>[^/]+)/rest/v1/rule/(?P<uuid>[^/]+)", self.rule_detail),
+            ]
+        ]
+        self.host = host
+        self.port = port
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._rule_buckets: Optional[Dict[str, List[int]]] = None
+
+    # ---- lifecycle and counters ----
+    def start(self) -> str:
+        fake = self
+
+        class Handler(FakeJiraHandler):
+            jira = fake
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.url
+
+    @property
+    def url(self) -> str:
+        assert self.server is not None, "server not started"
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def reset(self) -> None:
+        """Forget writes and zero the counters (between benchmark runs)."""
+        with self._lock:
+            self.request_count = 0
+            self.throttled_count = 0
+            self.route_counts: Counter = Counter()
+            self.role_additions: Dict[Tuple[int, int], set] = {}
+            self.group_additions: Dict[str, set] = {}
+            self.group_removals: Dict[str, set] = {}
+            self.deleted_workflows: set = set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": self.request_count, "throttled": self.throttled_count,
+                    "routes": dict(self.route_counts)}
+
+    def dispatch(self, method: str, raw_path: str, body: Any, base: str,
+                 headers: Optional[Dict[str, str]] = None) -> Reply:
+        parsed = urlparse(raw_path)
+        query = {k: v if len(v) > 1 else v[0] for k, v in parse_qs(parsed.query).items()}
+
+        for route_method, pattern, fn in self.routes:
+            if route_method != method:
+                continue
+            m = pattern.match(parsed.path)
+            if m is None:
+                continue
+            with self._lock:
+                self.request_count += 1
+                self.route_counts[f"{method} {pattern.pattern[:-1]}"] += 1
+                throttle = self.throttle_every and self.request_count % self.throttle_every == 0
+                if throttle:
+                    self.throttled_count += 1
+            if self.latency:
+                time.sleep(self.latency)
+            if throttle:
+                return Reply(429, {"errorMessages": ["Rate limit exceeded."]},
+                             headers={"Retry-After": f"{self.retry_after:g}"})
+            return fn(query=query, body=body, base=base, headers=headers or {}, **m.groupdict())
+
+        with self._lock:
+            self.request_count += 1
+        return Reply(404, {"errorMessages": [f"No route for {method} {parsed.path}"]})
+
+    # ---- helpers ----
+    def _paging(self, query: Dict[str, Any], default: int = 50) -> Tuple[int, int]:
+        start_at = int(query.get("startAt", 0) or 0)
+        max_results = int(query.get("maxResults", default) or default)
+        return start_at, max(1, min(max_results, self.site.max_page_size))
+
+    def _project_or_404(self, key: str) -> Optional[int]:
+        return self.site.project_index(key)
+
+    # ---- endpoints ----
+    def myself(self, **_: Any) -> Reply:
+        return Reply(200, self.site.user(0))
+
+    def tenant_info(self, **_: Any) -> Reply:
+        return Reply(200, {"cloudId": CLOUD_ID})
+
+    def project_search(self, query: Dict[str, Any], **_: Any) -> Reply:
+        start_at, max_results = self._paging(query)
+        with_types = "issueTypes" in str(query.get("expand", ""))
+        return Reply(200, page(lambda i: self.site.project(i, with_types), self.site.projects, start_at, max_results))
+
+    def project_detail(self, key: str, **_: Any) -> Reply:
+        i = self._project_or_404(key)
+        if i is None:
+            return Reply(404, {"errorMessages": ["No project could be found."]})
+        return Reply(200, self.site.project(i, issue_types=True))
+
+    def project_roles(self, key: str, base: str, **_: Any) -> Reply:
+        i = self._project_or_404(key)
+        if i is None:
+            return Reply(404, {"errorMessages": ["No project could be found."]})
+        pid = 10000 + i
+        return Reply(200, {
+            ROLE_NAMES[j]: f"{base}/rest/api/3/project/{pid}/role/{rid}"
+            for j, rid in enumerate(self.site.role_ids())
+        })
+
+    def _role(self, i: int, rid: int) -> Optional[Dict[str, Any]]:
+        j = rid - 10000
+        if not 0 <= j < self.site.roles_per_project:
+            return None
+        users = list(self.site.role_users(i, j))
+        with self._lock:
+            extra = sorted(self.role_additions.get((i, j), set()) - set(users))
+        actors = [
+            {"id": n, "type": "atlassian-user-role-actor", "displayName": account_id,
+             "actorUser": {"accountId": account_id}}
+            for n, account_id in enumerate(users + extra)
+        ]
+        if j == 1:
+            actors.append({"id": 9999, "type": "atlassian-group-role-actor",
+                           "displayName": self.site.group_name(0), "actorGroup": {"name": self.site.group_name(0)}})
+        return {"id": rid, "name": ROLE_NAMES[j], "description": f"{ROLE_NAMES[j]} of the project", "actors": actors}
+
+    def project_role(self, key: str, rid: str, **_: Any) -> Reply:
+        i = self._project_or_404(key)
+        role = self._role(i, int(rid)) if i is not None else None
+        if role is None:
+            return Reply(404, {"errorMessages": ["Role not found."]})
+        return Reply(200, role)
+
+    def add_role_actors(self, key: str, rid: str, body: Any, **_: Any) -> Reply:
+        i = self._project_or_404(key)
+        if i is None or self._role(i, int(rid)) is None:
+            return Reply(404, {"errorMessages": ["Role not found."]})
+        with self._lock:
+            self.role_additions.setdefault((i, int(rid) - 10000), set()).update((body or {}).get("user", []))
+        return Reply(200, self._role(i, int(rid)))
+
+    def _group_users(self, name: str) -> Optional[List[Dict[str, Any]]]:
+        m = re.fullmatch(r"group-(\d+)", name or "")
+        if not m or int(m.group(1)) >= self.site.groups:
+            return None
+        g = int(m.group(1))
+        users = self.site.group_members(g)
+        with self._lock:
+            removed = set(self.group_removals.get(name, set()))
+            added = sorted(self.group_additions.get(name, set()))
+        present = {u["accountId"] for u in users}
+        users = [u for u in users if u["accountId"] not in removed]
+        users += [self.site.user(int(a.split("-")[1])) for a in added if a not in present]
+        return users
+
+    def group_member(self, query: Dict[str, Any], **_: Any) -> Reply:
+        users = self._group_users(query.get("groupname", ""))
+        if users is None:
+            return Reply(404, {"errorMessages": ["Specified group does not exist."]})
+        start_at, max_results = self._paging(query)
+        return Reply(200, page(lambda n: users[n], len(users), start_at, max_results))
+
+    def group_add(self, query: Dict[str, Any], body: Any, **_: Any) -> Reply:
+        name = query.get("groupname", "")
+        if self._group_users(name) is None:
+            return Reply(404, {"errorMessages": ["Specified group does not exist."]})
+        account_id = (body or {}).get("accountId")
+        with self._lock:
+            self.group_additions.setdefault(name, set()).add(account_id)
+            self.group_removals.get(name, set()).discard(account_id)
+        return Reply(201, {"name": name})
+
+    def group_remove(self, query: Dict[str, Any], **_: Any) -> Reply:
+        name = query.get("groupname", "")
+        if self._group_users(name) is None:
+            return Reply(404, {"errorMessages": ["Specified group does not exist."]})
+        with self._lock:
+            self.group_removals.setdefault(name, set()).add(query.get("accountId"))
+            self.group_additions.get(name, set()).discard(query.get("accountId"))
+        return Reply(200)
+
+    def field_list(self, **_: Any) -> Reply:
+        return Reply(200, [self.site.field(k) for k in range(self.site.fields)])
+
+    def screen_list(self, query: Dict[str, Any], **_: Any) -> Reply:
+        start_at, max_results = self._paging(query, 100)
+        return Reply(200, page(lambda s: {"id": 1000 + s, "name": f"Screen {s}", "description": ""},
+                               self.site.screens, start_at, max_results))
+
+    def _screen_index(self, sid: str) -> Optional[int]:
+        s = int(sid) - 1000
+        return s if 0 <= s < self.site.screens else None
+
+    def screen_tabs(self, sid: str, **_: Any) -> Reply:
+        s = self._screen_index(sid)
+        if s is None:
+            return Reply(404, {"errorMessages": ["Screen not found."]})
+        return Reply(200, [{"id": 10000 + s * 10 + t, "name": f"Tab {t}"} for t in range(self.site.tabs_per_screen)])
+
+    def tab_field_list(self, sid: str, tid: str, **_: Any) -> Reply:
+        s = self._screen_index(sid)
+        t = int(tid) - 10000 - (s or 0) * 10
+        if s is None or not 0 <= t < self.site.tabs_per_screen:
+            return Reply(404, {"errorMessages": ["Tab not found."]})
+        return Reply(200, self.site.tab_fields(s, t))
+
+    def workflows_search(self, query: Dict[str, Any], **_: Any) -> Reply:
+        start_at, max_results = self._paging(query)
+        return Reply(200, page(lambda w: {"id": f"wf-{w}", "name": self.site.workflow_name(w)},
+                               self.site.workflows, start_at, max_results))
+
+    def workflows_read(self, body: Any, **_: Any) -> Reply:
+        names = (body or {}).get("workflowNames", [])
+        workflows, refs = [], []
+        for name in names:
+            w = 0 if name == "jira" else int(name.rsplit(" ", 1)[1]) if name.startswith("Workflow ") else -1
+            if 0 <= w < self.site.workflows:
+                workflows.append(self.site.workflow(w))
+                refs.extend(r for r in self.site.workflow_status_refs(w) if r not in refs)
+        return Reply(200, {"workflows": workflows, "statuses": [self.site.status(r) for r in refs]})
+
+    def workflow_search(self, query: Dict[str, Any], **_: Any) -> Reply:
+        start_at, max_results = self._paging(query)
+        with self._lock:
+            live = [w for w in range(self.site.workflows) if f"wf-{w}" not in self.deleted_workflows]
+
+        def item(n: int) -> Dict[str, Any]:
+            w = live[n]
+            used = self.site.workflow_in_use(w)
+            return {
+                "id": {"name": self.site.workflow_name(w), "entityId": f"wf-{w}"},
+                "schemes": [{"id": 20000 + w % self.site.workflow_schemes}] if used else [],
+                "projects": [],
+            }
+
+        return Reply(200, page(item, len(live), start_at, max_results))
+
+    def workflow_delete(self, wid: str, **_: Any) -> Reply:
+        w = int(wid.split("-")[1]) if re.fullmatch(r"wf-\d+", wid) else -1
+        with self._lock:
+            if not 0 <= w < self.site.workflows or wid in self.deleted_workflows:
+                return Reply(404, {"errorMessages": ["Workflow not found."]})
+            if self.site.workflow_in_use(w):
+                return Reply(400, {"errorMessages": ["Workflow is active."]})
+            self.deleted_workflows.add(wid)
+        return Reply(204)
+
+    def workflow_scheme_projects(self, query: Dict[str, Any], **_: Any) -> Reply:
+        ids = query.get("projectId", [])
+        ids = [ids] if isinstance(ids, str) else ids
+        by_scheme: Dict[str, List[str]] = {}
+        for pid in ids:
+            i = self.site.project_index(pid)
+            if i is not None:
+                by_scheme.setdefault(self.site.workflow_scheme_id(i), []).append(pid)
+        return Reply(200, {"values": [{"workflowScheme": {"id": int(sid)}, "projectIds": pids}
+                                      for sid, pids in by_scheme.items()]})
+
+    def workflow_scheme_detail(self, sid: str, **_: Any) -> Reply:
+        if not 0 <= int(sid) - 20000 < self.site.workflow_schemes:
+            return Reply(404, {"errorMessages": ["Workflow scheme not found."]})
+        return Reply(200, self.site.workflow_scheme(int(sid)))
+
+    def priority_scheme_list(self, query: Dict[str, Any], **_: Any) -> Reply:
+        start_at, max_results = self._paging(query)
+        return Reply(200, page(lambda s: {"id": str(30000 + s), "name": f"Priority scheme {s}"},
+                               self.site.priority_schemes, start_at, max_results))
+
+    def priority_scheme_projects(self, sid: str, query: Dict[str, Any], **_: Any) -> Reply:
+        s = int(sid) - 30000
+        if not 0 <= s < self.site.priority_schemes:
+            return Reply(404, {"errorMessages": ["Priority scheme not found."]})
+        members = list(range(s, self.site.projects, self.site.priority_schemes))
+        start_at, max_results = self._paging(query)
+        return Reply(200, page(lambda n: {"id": str(10000 + members[n])}, len(members), start_at, max_results))
+
+    def filter_search(self, query: Dict[str, Any], **_: Any) -> Reply:
+        start_at, max_results = self._paging(query)
+        return Reply(200, page(self.site.filter, self.site.filters, start_at, max_results))
+
+    def dashboard_search(self, query: Dict[str, Any], **_: Any) -> Reply:
+        start_at, max_results = self._paging(query)
+        return Reply(200, page(self.site.dashboard, self.site.dashboards, start_at, max_results))
+
+    def dashboard_gadgets(self, did: str, **_: Any) -> Reply:
+        n = int(did) - 10000
+        if not 0 <= n < self.site.dashboards or n % 25 == 24:
+            return Reply(404, {"errorMessages": ["Dashboard not found or not visible."]})
+        return Reply(200, {"gadgets": [
+            {"id": n * 100 + g, "title": f"Gadget {g}", "moduleKey": "com.atlassian.jira.gadgets:filter-results-gadget",
+             "color": "blue", "position": {"row": g // 2, "column": g % 2}}
+            for g in range(self.site.gadgets_per_dashboard)
+        ]})
+
+    def permission_scheme_list(self, query: Dict[str, Any], **_: Any) -> Reply:
+        expand = "permissions" in str(query.get("expand", ""))
+        schemes = []
+        for s in range(self.site.permission_schemes):
+            scheme = {"id": 40000 + s, "name": f"Permission scheme {s}"}
+            if expand:
+                scheme["permissions"] = self.site.permission_grants(s)
+            schemes.append(scheme)
+        return Reply(200, {"permissionSchemes": schemes})
+
+    def permission_scheme_grants(self, sid: str, **_: Any) -> Reply:
+        s = int(sid) - 40000
+        if not 0 <= s < self.site.permission_schemes:
+            return Reply(404, {"errorMessages": ["Permission scheme not found."]})
+        return Reply(200, {"permissions": self.site.permission_grants(s)})
+
+    def issue(self, key: str, base: str, **_: Any) -> Reply:
+        project_key = key.rsplit("-", 1)[0]
+        if self.site.project_index(project_key) is None:
+            return Reply(404, {"errorMessages": ["Issue does not exist or you do not have permission to see it."]})
+        attachments = [
+            {
+                "id": str(50000 + a),
+                "filename": f"file-{a % max(1, self.site.attachments - 1)}.bin",
+                "size": len(self.site.attachment_bytes(a)),
+                "created": (EPOCH + timedelta(hours=a)).strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+                "mimeType": "application/octet-stream",
+                "content": f"{base}/rest/api/3/attachment/content/{50000 + a}",
+            }
+            for a in range(self.site.attachments)
+        ]
+        return Reply(200, {"id": "90000", "key": key, "fields": {"attachment": attachments}})
+
+    def attachment_content(self, aid: str, headers: Optional[Dict[str, str]] = None, **_: Any) -> Reply:
+        a = int(aid) - 50000
+        if not 0 <= a < self.site.attachments:
+            return Reply(404, {"errorMessages": ["Attachment not found."]})
+        data = self.site.attachment_bytes(a)
+        rng = re.fullmatch(r"bytes=(\d+)-", (headers or {}).get("Range", ""))
+        if rng:
+            start = int(rng.group(1))
+            if start >= len(data):
+                return Reply(416, body=b"", headers={"Content-Range": f"bytes */{len(data)}"})
+            return Reply(206, body=data[start:], headers={
+                "Content-Type": "application/octet-stream",
+                "Content-Range": f"bytes {start}-{len(data) - 1}/{len(data)}",
+            })
+        return Reply(200, body=data, headers={"Content-Type": "application/octet-stream"})
+
+    def _rules_for_scope(self, scope: Optional[str]) -> List[int]:
+        if not scope:
+            return list(range(self.site.rules))
+        with self._lock:
+            if self._rule_buckets is None:
+                buckets: Dict[str, List[int]] = {}
+                for n in range(self.site.rules):
+                    for ari in self.site.rule_scope(n):
+                        buckets.setdefault(ari, []).append(n)
+                self._rule_buckets = buckets
+            return self._rule_buckets.get(scope, [])
+
+    def rule_summaries(self, query: Dict[str, Any], body: Any, **_: Any) -> Reply:
+        args = {**query, **(body or {})}
+        rules = self._rules_for_scope(args.get("scope"))
+        offset = int(args.get("cursor") or 0)
+        limit = max(1, min(int(args.get("limit") or 100), 100))
+        end = min(len(rules), offset + limit)
+        return Reply(200, {
+            "data": [self.site.rule_summary(n) for n in rules[offset:end]],
+            "links": {"next": f"?cursor={end}" if end < len(rules) else None},
+        })
+
+    def rule_detail(self, uuid: str, **_: Any) -> Reply:
+        m = re.fullmatch(r"rule-(\d+)", uuid)
+        if not m or int(m.group(1)) >= self.site.rules:
+            return Reply(404, {"errorMessages": ["Rule not found."]})
+        return Reply(200, {"rule": self.site.rule(int(m.group(1)))})
+
+
+class FakeJiraHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body leave in one write (an unbuffered writer plus delayed ACKs
+    # would otherwise add ~40 ms to every keep-alive response)
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    jira: FakeJira
+
+    def _handle(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = None
+
+        reply = self.jira.dispatch(method, self.path, body, f"http://{self.headers.get('Host')}", dict(self.headers))
+
+        self.send_response(reply.status)
+        for name, value in reply.headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(reply.body)))
+        self.end_headers()
+        if method != "HEAD":
+            self.wfile.write(reply.body)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_PUT(self) -> None:
+        self._handle("PUT")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a synthetic Jira site for offline runs.")
+    parser.add_argument("--size", choices=sorted(FakeSite.PRESETS), default="small")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = FakeJira(FakeSite.preset(args.size), host=args.host, port=args.port, latency=args.latency,
+                      throttle_every=args.throttle_every, retry_after=args.retry_after)
+    print(f"Fake Jira ({args.size}) on {server.start()}  (cloudId {CLOUD_ID}); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stats = server.stats()
+        print(f"\n{stats['requests']} requests ({stats['throttled']} throttled)")
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
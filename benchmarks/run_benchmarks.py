@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks: runs each script's main path against the fake Jira in
+fake_jira.py and records wall time, request count and peak RSS.
+
+- Every scenario runs in its own Python process (so peak RSS is that
+  script's alone) inside a scratch directory; the JiraClient in that process
+  is pointed at the fake server, including api.atlassian.com URLs
+- The server is reset before each run, so writes from one scenario (role
+  adds, workflow deletes, ...) don't leak into the next
+- --set NAME=VALUE overrides a script's module constants after import (e.g.
+  MAX_WORKERS=1); --sweep NAME=v1,v2,... runs every scenario once per value
+  to compare concurrency settings
+- --save writes the results as JSON; --baseline compares against such a file
+  and exits non-zero when a scenario got slower (beyond --tolerance) or
+  started sending more requests
+
+Usage:
+  python benchmarks/run_benchmarks.py --size small
+  python benchmarks/run_benchmarks.py --size medium --latency 0.05 --only filters dashboards
+  python benchmarks/run_benchmarks.py --sweep MAX_WORKERS=1,4,8 --only screens
+  python benchmarks/run_benchmarks.py --save before.json
+  python benchmarks/run_benchmarks.py --baseline before.json --tolerance 0.2
+
+The templates (automation_rule_audit_template.py, permission_checker_template.py)
+need site-specific edits before they run, so they are not benchmarked.
+"""
+
+import argparse
+import ast
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, Optional
+
+from fake_jira import CLOUD_ID, FakeJira, FakeSite
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_MARKER = "BENCHMARK_RESULT "
+# Run-time differences smaller than this are noise, whatever the ratio
+NOISE_FLOOR_S = 0.1
+
+EMAIL = "bench@example.com"
+API_TOKEN = "token"
+
+
+# =========================
+# SCENARIOS
+# =========================
+# name -> (script file, entry(globals, url)). Entries call the same functions
+# the script's own main / __main__ block does, minus interactive prompts.
+def _add_users_to_role(g: Dict[str, Any], url: str) -> None:
+    g["ALL_PROJECTS"] = True
+    g["main"]()
+
+
+def _clone_groups(g: Dict[str, Any], url: str) -> None:
+    g["GROUP_PAIRS"] = [("group-0", "group-1"), ("group-2", "group-3")]
+    g["REMOVE_EXTRAS"] = True
+    g["mirror_all"]()
+
+
+def _delete_workflows(g: Dict[str, Any], url: str) -> None:
+    g["DRY_RUN"] = False
+    g["clean_workflows"]()
+
+
+def _download_attachments(g: Dict[str, Any], url: str) -> None:
+    g["download_attachments"]("P0-1", "attachments")
+
+
+def _project_admins(g: Dict[str, Any], url: str) -> None:
+    g["check_projects_missing_admins"](url, EMAIL, API_TOKEN, "admins.csv")
+
+
+def _issue_type_viewer(g: Dict[str, Any], url: str) -> None:
+    client = g["connect_to_jira"](url, EMAIL, API_TOKEN)
+    g["save_to_csv"](g["echo_rows"](g["iter_projects_and_issue_types"](client)))
+
+
+def _main(g: Dict[str, Any], url: str) -> None:
+    g["main"]()
+
+
+SCENARIOS: Dict[str, tuple] = {
+    "add-role-users": ("Add users to a project role.py", _add_users_to_role),
+    "clone-groups": ("Clone group memberships.py", _clone_groups),
+    "custom-fields": ("Count custom fields.py", lambda g, url: g["get_custom_fields"]()),
+    "dashboards": ("Dashboard gadget analyser.py", _main),
+    "delete-workflows": ("Detect & delete inactive workflows.py", _delete_workflows),
+    "attachments": ("Download all attachments.py", _download_attachments),
+    "screens": ("Fields on screens.py", _main),
+    "automation-rules": ("List automation rules.py", _main),
+    "project-admins": ("List project admins.py", _project_admins),
+    "filters": ("Lookup old filters.py", _main),
+    "project-report": ("Project analyser report.py", _main),
+    "issue-types": ("Project issue Type Viewer.py", _issue_type_viewer),
+    "workflows": ("Workflow analyser report.py", _main),
+}
+
+
+# =========================
+# CHILD PROCESS
+# =========================
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def point_client_at(url: str) -> None:
+    """Every JiraClient in this process talks to the fake server instead."""
+    import jira_client
+
+    original_init = jira_client.JiraClient.__init__
+    original_url = jira_client.JiraClient.url
+
+    def __init__(self, base_url, *args, **kwargs):
+        original_init(self, url, *args, **kwargs)
+
+    def to_fake(self, path):
+        if path.startswith("https://api.atlassian.com"):
+            path = url + path[len("https://api.atlassian.com"):]
+        return original_url(self, path)
+
+    jira_client.JiraClient.__init__ = __init__
+    jira_client.JiraClient.url = to_fake
+
+
+def run_child(scenario: str, url: str, overrides: Dict[str, Any], max_rate: Optional[float]) -> None:
+    import builtins
+    import getpass
+    import importlib.util
+
+    sys.path.insert(0, REPO_ROOT)
+    sys.argv = [SCENARIOS[scenario][0]]
+    point_client_at(url)
+
+    import jira_client
+    if max_rate:
+        jira_client.default_rate_limiter.max_rate = max_rate
+        jira_client.default_rate_limiter.rate = max_rate
+
+    # Scripts that prompt for credentials get the fake site's
+    answers = {"url": url, "email": EMAIL}
+    builtins.input = lambda prompt="": answers["url"] if "url" in prompt.lower() else answers["email"]
+    getpass.getpass = lambda prompt="": API_TOKEN
+
+    script, entry = SCENARIOS[scenario]
+    output = io.StringIO()
+    with redirect_stdout(output):
+        started = time.perf_counter()
+        # A real module (not runpy's copy of its globals), so overrides reach the functions
+        spec = importlib.util.spec_from_file_location("benchmark_target", os.path.join(REPO_ROOT, script))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        imported = time.perf_counter()
+        g = vars(module)
+        g.update(overrides)
+        error = None
+        try:
+            entry(g, url)
+        except SystemExit as e:
+            error = f"exit {e.code}" if e.code else None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finished = time.perf_counter()
+
+    print(RESULT_MARKER + json.dumps({
+        "import_s": imported - started,
+        "run_s": finished - imported,
+        "peak_rss_mb": peak_rss_mb(),
+        "output_lines": output.getvalue().count("\n"),
+        "error": error,
+        "output_tail": output.getvalue().splitlines()[-5:] if error else [],
+    }))
+
+
+# =========================
+# PARENT
+# =========================
+def run_scenario(server: FakeJira, scenario: str, overrides: Dict[str, Any],
+                 max_rate: Optional[float], timeout: float) -> Dict[str, Any]:
+    server.reset()
+    with tempfile.TemporaryDirectory(prefix=f"bench-{scenario}-") as workdir:
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", scenario, "--url", server.url,
+               "--overrides", json.dumps(overrides)]
+        if max_rate:
+            cmd += ["--max-rate", str(max_rate)]
+        started = time.perf_counter()
+        try:
+            proc = subprocess.run(cmd, cwd=workdir, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc = None
+        wall = time.perf_counter() - started
+
+    stats = server.stats()
+    result: Dict[str, Any] = {
+        "scenario": scenario,
+        "overrides": overrides,
+        "wall_s": wall,
+        "requests": stats["requests"],
+        "throttled": stats["throttled"],
+        "routes": stats["routes"],
+    }
+    if proc is None:
+        result["error"] = f"timed out after {timeout:g}s"
+        return result
+
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result.update(json.loads(line[len(RESULT_MARKER):]))
+            break
+    else:
+        result["error"] = (proc.stderr.strip().splitlines() or [f"exit {proc.returncode}"])[-1]
+    return result
+
+
+def parse_assignment(text: str) -> tuple:
+    name, _, value = text.partition("=")
+    try:
+        return name, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return name, value
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    print(f"\n{'Scenario':<20} {'Settings':<22} {'Wall s':>8} {'Run s':>8} {'Requests':>9} "
+          f"{'429s':>5} {'Peak MB':>8}  Error")
+    print("-" * 100)
+    for r in results:
+        settings = ",".join(f"{k}={v}" for k, v in r["overrides"].items()) or "-"
+        run_s = f"{r['run_s']:.2f}" if r.get("run_s") is not None else "-"
+        rss = f"{r['peak_rss_mb']:.1f}" if r.get("peak_rss_mb") is not None else "-"
+        print(f"{r['scenario']:<20} {settings[:22]:<22} {r['wall_s']:>8.2f} {run_s:>8} "
+              f"{r['requests']:>9} {r['throttled']:>5} {rss:>8}  {r.get('error') or ''}")
+        for line in r.get("output_tail") or []:
+            print(f"{'':<20} | {line}")
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> List[str]:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    def key(r: Dict[str, Any]) -> str:
+        return r["scenario"] + json.dumps(r["overrides"], sort_keys=True)
+
+    before = {key(r): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = before.get(key(r))
+        if old is None or old.get("error") or r.get("error"):
+            continue
+        if r["run_s"] > old["run_s"] * (1 + tolerance) and r["run_s"] - old["run_s"] > NOISE_FLOOR_S:
+            regressions.append(f"{r['scenario']}: run time {old['run_s']:.2f}s -> {r['run_s']:.2f}s")
+        if r["requests"] > old["requests"]:
+            regressions.append(f"{r['scenario']}: requests {old['requests']} -> {r['requests']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the scripts against a local fake Jira.")
+    parser.add_argument("--size", choices=sorted(FakeSite.PRESETS), default="small")
+    parser.add_argument("--site", action="append", default=[], metavar="NAME=VALUE",
+                        help="override one FakeSite size, e.g. --site projects=3000")
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), help="run just these scenarios")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--max-rate", type=float, default=0,
+                        help="cap the client at this many requests/second (0 = no cap, as in production)")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="override a script constant after import")
+    parser.add_argument("--sweep", metavar="NAME=V1,V2,...", help="run every scenario once per value")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=900)
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed run-time growth vs. baseline")
+    # Internal: one scenario inside the child process
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--overrides", default="{}", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.url, json.loads(args.overrides), args.max_rate)
+        return
+
+    site = FakeSite.preset(args.size, **dict(parse_assignment(s) for s in args.site))
+    server = FakeJira(site, latency=args.latency, throttle_every=args.throttle_every,
+                      retry_after=args.retry_after)
+    url = server.start()
+    print(f"Fake Jira ({args.size}) on {url}  cloudId={CLOUD_ID}")
+
+    base_overrides = dict(parse_assignment(s) for s in args.set)
+    variants = [base_overrides]
+    if args.sweep:
+        name, _, values = args.sweep.partition("=")
+        variants = [{**base_overrides, name: parse_assignment(f"{name}={v}")[1]} for v in values.split(",")]
+
+    results = []
+    try:
+        for scenario in args.only or sorted(SCENARIOS):
+            for overrides in variants:
+                for _ in range(args.repeat):
+                    r = run_scenario(server, scenario, overrides, args.max_rate, args.timeout)
+                    results.append(r)
+                    print(f"  {scenario:<20} {r['wall_s']:6.2f}s  {r['requests']:>6} requests"
+                          + (f"  ({r['error']})" if r.get("error") else ""), flush=True)
+    finally:
+        server.stop()
+
+    print_table(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "size": args.size,
+                "site": vars(site),
+                "latency": args.latency,
+                "throttle_every": args.throttle_every,
+                "results": results,
+            }, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Opt-in on-disk cache for slow-changing Jira metadata (fields, projects,
+workflow schemes, screens, ...), used by JiraClient.get_json.
+
+- Entries are keyed by method + URL + params + identity (site and user)
+- Only endpoints with a TTL rule are cached; fresh entries skip the network
+- Stale entries are revalidated with If-None-Match / If-Modified-Since when
+  Jira sent an ETag / Last-Modified; a 304 just renews the entry
+- The store is a single SQLite file, trimmed to max_bytes by least-recent use
+
+Command line (see cache_from_argv):
+  --cache      use the cache even if the script's USE_CACHE is False
+  --no-cache   never read or write the cache
+  --refresh    ignore stored entries, refetch and overwrite them
+
+Usage:
+  from jira_cache import cache_from_argv
+
+  client = JiraClient(JIRA_BASE_URL, EMAIL, API_TOKEN, cache=cache_from_argv(USE_CACHE))
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Tuple
+from urllib.parse import urlparse
+
+
+DEFAULT_CACHE_PATH = ".jira_cache.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+HOUR = 3600
+
+# (URL path regex, TTL in seconds). First match wins; no match = not cached.
+DEFAULT_TTLS: List[Tuple[str, float]] = [
+    (r"^/rest/api/[23]/field$", 24 * HOUR),
+    (r"^/rest/api/3/project/search$", 1 * HOUR),
+    (r"^/rest/api/3/workflowscheme/project$", 1 * HOUR),
+    (r"^/rest/api/3/workflowscheme/\d+$", 6 * HOUR),
+    (r"^/rest/api/3/priorityscheme(/\d+/projects)?$", 6 * HOUR),
+    (r"^/rest/api/3/screens$", 6 * HOUR),
+]
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttls: Sequence[Tuple[str, float]] = DEFAULT_TTLS,
+        refresh: bool = False,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.rules: List[Tuple[Pattern[str], float]] = [(re.compile(p), ttl) for p, ttl in ttls]
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL,
+                last_used REAL,
+                size INTEGER
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self._db.commit()
+
+    def ttl_for(self, url: str) -> Optional[float]:
+        path = urlparse(url).path
+        for pattern, ttl in self.rules:
+            if pattern.search(path):
+                return ttl
+        return None
+
+    @staticmethod
+    def key(method: str, url: str, params: Any, identity: str) -> str:
+        if isinstance(params, dict):
+            params = sorted((str(k), str(v)) for k, v in params.items())
+        elif params:
+            params = [(str(k), str(v)) for k, v in params]
+        raw = json.dumps([method.upper(), url, params or [], identity])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.refresh:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        body, etag, last_modified, stored_at = row
+        return {"body": body, "etag": etag, "last_modified": last_modified, "stored_at": stored_at}
+
+    def put(
+        self,
+        key: str,
+        url: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, body, etag, last_modified, now, now, len(body)),
+            )
+            self._evict()
+            self._db.commit()
+
+    def touch(self, key: str) -> None:
+        """Entry was revalidated (304): treat it as freshly stored."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET stored_at = ?, last_used = ? WHERE key = ?", (now, now, key)
+            )
+            self._db.commit()
+
+    def _evict(self) -> None:
+        (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def cache_from_argv(
+    enabled: bool = False,
+    argv: Optional[Sequence[str]] = None,
+    path: str = DEFAULT_CACHE_PATH,
+) -> Optional[ResponseCache]:
+    """
+    Build the cache a script asked for. `enabled` is the script's USE_CACHE
+    setting; --cache / --no-cache / --refresh on the command line override it.
+    """
+    args = list(sys.argv[1:] if argv is None else argv)
+    if "--no-cache" in args:
+        return None
+    refresh = "--refresh" in args
+    if not (enabled or refresh or "--cache" in args):
+        return None
+    return ResponseCache(path, refresh=refresh)
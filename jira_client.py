@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for the Jira scripts in this folder.
+
+- One pooled keep-alive requests.Session per client (pool size is configurable)
+- Basic auth and default headers are set once, not rebuilt per request
+- Every call gets the same timeout
+- request_json / get_json / post_json hand back parsed JSON and raise
+  requests.HTTPError (with the response attached) on 4xx/5xx
+- Every call goes through a token-bucket RateLimiter (shared by all clients
+  in the process). It runs unthrottled until Jira pushes back, then learns
+  the allowed rate from Retry-After, Beta-Retry-After and X-RateLimit-*
+  headers; 429/5xx are retried with jittered exponential backoff
+- Optional on-disk ResponseCache (see jira_cache.py) for slow-changing
+  metadata GETs, with ETag / Last-Modified revalidation
+
+Usage:
+  from jira_client import JiraClient
+
+  client = JiraClient(JIRA_BASE_URL, EMAIL, API_TOKEN)
+  data = client.get_json("/rest/api/3/project/search", params={"startAt": 0})
+
+Requirements:
+  pip install requests
+"""
+
+import json as jsonlib
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+
+from jira_cache import ResponseCache
+
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_RETRIES = 5
+
+# Token bucket defaults: full speed until Jira says otherwise. A script that
+# wants a hard ceiling passes RateLimiter(max_rate=...) explicitly.
+DEFAULT_MAX_RATE: Optional[float] = None   # requests / second; None = no ceiling
+DEFAULT_MIN_RATE = 0.5
+DEFAULT_BURST = 20
+# Requests used to measure the throughput at which Jira starts throttling
+THROUGHPUT_WINDOW = 50
+
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+}
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """X-RateLimit-Reset is an ISO 8601 timestamp; returns seconds from now."""
+    if not value:
+        return None
+    try:
+        when = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _loads(body: bytes) -> Any:
+    return jsonlib.loads(body) if body else {}
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter (attempt starts at 1)."""
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket that adapts to Jira's rate-limit headers.
+
+    - No signal from Jira: no limit at all (unless max_rate is given)
+    - Retry-After / Beta-Retry-After or a 429: the rate is set to half the
+      throughput that got throttled and every caller is held until the
+      server's deadline (plus jitter). Requests already in flight when that
+      happened belong to the same throttle: they extend the hold but don't
+      cut the rate again
+    - X-RateLimit-NearLimit: the rate is cut by a quarter
+    - X-RateLimit-Remaining + X-RateLimit-Reset: the rate is capped so the
+      remaining budget lasts until the reset time
+    - Clean responses after that: the rate creeps back up, and the limit is
+      lifted again once it passes the throughput that was last throttled
+    """
+
+    def __init__(
+        self,
+        max_rate: Optional[float] = DEFAULT_MAX_RATE,
+        burst: int = DEFAULT_BURST,
+        min_rate: float = DEFAULT_MIN_RATE,
+    ) -> None:
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate) if max_rate else min_rate
+        # None = not limited; otherwise requests / second
+        self.rate: Optional[float] = max_rate
+        self.throttled_at: Optional[float] = None
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        # When the rate was last cut; throttles on requests sent before it are the same event
+        self.penalized_at: Optional[float] = None
+        # Send times of the latest requests, to measure the throughput Jira reacts to
+        self._sent: deque = deque(maxlen=THROUGHPUT_WINDOW)
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.rate is None:
+            self.tokens = self.capacity
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """Block until a request may be sent. Returns the send time (pass it to observe)."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    self._sent.append(now)
+                    return now
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def _throughput(self, now: float) -> float:
+        """Current rate limit, or (when unlimited) the rate requests are actually going out at."""
+        if self.rate is not None:
+            return self.rate
+        if len(self._sent) >= 2 and now > self._sent[0]:
+            return len(self._sent) / (now - self._sent[0])
+        return self.throttled_at or self.capacity
+
+    def _set_rate(self, rate: float) -> None:
+        if self.max_rate is None and self.throttled_at is not None and rate >= self.throttled_at:
+            self.rate = None  # back past where Jira pushed back: full speed again
+            return
+        if self.max_rate is not None:
+            rate = min(self.max_rate, rate)
+        self.rate = max(self.min_rate, rate)
+
+    def penalize(self, delay: float, sent_at: Optional[float] = None) -> None:
+        """
+        Hold every caller for `delay` seconds (plus jitter) and halve the rate,
+        unless the throttled request (sent at `sent_at`) went out before the
+        last cut, in which case the rate has already been halved for it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if sent_at is None or self.penalized_at is None or sent_at >= self.penalized_at:
+                self.throttled_at = self._throughput(now)
+                self.rate = max(self.min_rate, self.throttled_at / 2)
+                self.penalized_at = now
+                # Measure afresh once the hold is over, so the pause isn't counted as slowness
+                self._sent.clear()
+            until = now + delay + random.uniform(0, min(1.0, delay / 4 + 0.1))
+            self.blocked_until = max(self.blocked_until, until)
+            self.tokens = 0.0
+
+    def observe(self, response: requests.Response, sent_at: Optional[float] = None) -> Optional[float]:
+        """
+        Learn from a response's headers (sent_at is what acquire() returned for
+        it). Returns the server-requested delay (Retry-After / Beta-Retry-After)
+        if there was one.
+        """
+        h = response.headers
+        retry_after = _parse_retry_after(h.get("Retry-After"))
+        beta_retry_after = _parse_retry_after(h.get("Beta-Retry-After"))
+        delays = [d for d in (retry_after, beta_retry_after) if d is not None]
+        delay = max(delays) if delays else None
+
+        if delay is not None:
+            self.penalize(delay, sent_at)
+            return delay
+
+        if response.status_code == 429:
+            return None
+
+        with self._lock:
+            now = time.monotonic()
+            remaining = h.get("X-RateLimit-Remaining")
+            reset_in = _parse_reset(h.get("X-RateLimit-Reset"))
+            if h.get("X-RateLimit-NearLimit", "").lower() == "true":
+                self._refill(now)
+                self._set_rate(self._throughput(now) * 0.75)
+            elif remaining is not None and reset_in:
+                try:
+                    budget = float(remaining) / reset_in
+                except ValueError:
+                    pass
+                else:
+                    self._refill(now)
+                    self._set_rate(budget)
+            elif self.rate is not None:
+                # Additive increase back towards full speed.
+                step = (self.max_rate or self.throttled_at or self.rate) / 20
+                self._set_rate(self.rate + step)
+        return None
+
+
+# One bucket per process, so every client (and thread) shares the budget.
+default_rate_limiter = RateLimiter()
+
+
+class JiraClient:
+    def __init__(
+        self,
+        base_url: str,
+        email: str,
+        api_token: str,
+        *,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        headers: Optional[Dict[str, str]] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        self.base_url = (base_url or "").strip().rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or default_rate_limiter
+        self.cache = cache
+        # Cache entries are scoped to site + user; the token never leaves the session.
+        self.identity = f"{self.base_url}|{email}"
+
+        self.session = requests.Session()
+        self.session.auth = HTTPBasicAuth(email, api_token)
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+
+        # One adapter per scheme; pool_maxsize is how many keep-alive
+        # connections a single host can hold open at once.
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def url(self, path: str) -> str:
+        """Full URLs (e.g. 'self' links, api.atlassian.com) pass through untouched."""
+        if path.startswith(("http://", "https://")):
+            return path
+        return self.base_url + (path if path.startswith("/") else "/" + path)
+
+    def request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+        """
+        Raw response, for callers that need the status code or a streamed body.
+        429/5xx are retried up to max_retries; the last response is returned.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        url = self.url(path)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            sent_at = self.rate_limiter.acquire()
+            response = self.session.request(method, url, **kwargs)
+            delay = self.rate_limiter.observe(response, sent_at)
+
+            if response.status_code not in RETRY_STATUSES or attempt > self.max_retries:
+                return response
+
+            response.close()
+            if delay is not None:
+                continue
+            if response.status_code in THROTTLE_STATUSES:
+                # Throttled with no server deadline: back off with jitter and slow everyone down.
+                self.rate_limiter.penalize(backoff_delay(attempt), sent_at)
+            else:
+                # Plain server error: only this call backs off; the shared rate is untouched.
+                time.sleep(backoff_delay(attempt))
+
+    def request_json(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Any = None,
+        json: Optional[Any] = None,
+    ) -> Any:
+        if self.cache is not None and method.upper() == "GET" and json is None:
+            ttl = self.cache.ttl_for(self.url(path))
+            if ttl is not None:
+                return self._cached_get(path, params, ttl)
+
+        response = self.request(method, path, params=params, json=json)
+        return self._parse(method, response)
+
+    @staticmethod
+    def _parse(method: str, response: requests.Response) -> Any:
+        if response.status_code >= 400:
+            raise requests.HTTPError(
+                f"{method} {response.url} failed ({response.status_code}): {response.text}",
+                response=response,
+            )
+        return response.json() if response.content else {}
+
+    def _cached_get(self, path: str, params: Any, ttl: float) -> Any:
+        url = self.url(path)
+        key = self.cache.key("GET", url, params, self.identity)
+        entry = self.cache.get(key)
+
+        if entry is not None and time.time() - entry["stored_at"] < ttl:
+            return _loads(entry["body"])
+
+        headers: Dict[str, str] = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.request("GET", path, params=params, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(key)
+            return _loads(entry["body"])
+
+        data = self._parse("GET", response)
+        self.cache.put(
+            key,
+            url,
+            response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return data
+
+    def get_json(self, path: str, params: Any = None) -> Any:
+        return self.request_json("GET", path, params=params)
+
+    def post_json(self, path: str, json: Optional[Any] = None, params: Any = None) -> Any:
+        return self.request_json("POST", path, params=params, json=json)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "JiraClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
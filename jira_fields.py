@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Persisted index of the Jira field catalogue (/rest/api/2/field), shared by the
+reports that touch fields so they don't each download it again.
+
+- Per field: id, name, custom flag, schema type and searcher
+- Lookups by id and by name are dict hits; names are not unique in Jira, so
+  by_name() returns every matching id
+- Saved as one small JSON file (rows, not the raw API objects) tagged with the
+  site it came from; an index from another site is ignored
+
+"Count custom fields.py" writes the index; other scripts load it with
+load_or_fetch(), which only calls Jira when no usable index file exists.
+
+Usage:
+  from jira_fields import load_or_fetch
+
+  fields = load_or_fetch(client)
+  fields.name("customfield_10010")       # "Sprint"
+  fields.by_name("Story Points")         # ["customfield_10016", "customfield_10028"]
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from jira_client import JiraClient
+
+
+DEFAULT_INDEX_PATH = "jira_field_index.json"
+FIELD_ENDPOINT = "/rest/api/2/field"
+
+
+class FieldInfo(NamedTuple):
+    id: str
+    name: str
+    custom: bool
+    schema_type: str
+    searcher: str
+
+
+class FieldIndex:
+    def __init__(self, fields: Iterable[FieldInfo], site: str = "") -> None:
+        self.site = site
+        self._by_id: Dict[str, FieldInfo] = {}
+        self._by_name: Dict[str, List[str]] = {}
+        for info in fields:
+            self._by_id[info.id] = info
+            self._by_name.setdefault(info.name.casefold(), []).append(info.id)
+
+    @classmethod
+    def from_api(cls, fields: Iterable[Dict[str, Any]], site: str = "") -> "FieldIndex":
+        """Builds the index from the raw /field response."""
+        rows = []
+        for f in fields:
+            if not f.get("id"):
+                continue
+            schema = f.get("schema") or {}
+            rows.append(
+                FieldInfo(
+                    str(f["id"]),
+                    f.get("name") or "",
+                    bool(f.get("custom")),
+                    schema.get("custom") or schema.get("type") or "",
+                    f.get("searcherKey") or "",
+                )
+            )
+        return cls(rows, site)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> "FieldIndex":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls((FieldInfo(*row) for row in data["fields"]), data.get("site", ""))
+
+    def save(self, path: str = DEFAULT_INDEX_PATH) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"site": self.site, "fields": [list(info) for info in self._by_id.values()]},
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        os.replace(tmp, path)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, field_id: str) -> bool:
+        return field_id in self._by_id
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def get(self, field_id: str) -> Optional[FieldInfo]:
+        return self._by_id.get(field_id)
+
+    def by_name(self, name: str) -> List[str]:
+        """Ids of every field with this name (case-insensitive)."""
+        return list(self._by_name.get(name.casefold(), []))
+
+    def duplicate_names(self) -> Dict[str, List[str]]:
+        return {
+            self._by_id[ids[0]].name: list(ids)
+            for ids in self._by_name.values()
+            if len(ids) > 1
+        }
+
+    def name(self, field_id: str, default: str = "") -> str:
+        info = self._by_id.get(field_id)
+        return info.name if info else default
+
+    def is_custom(self, field_id: str) -> bool:
+        info = self._by_id.get(field_id)
+        if info is None:
+            return field_id.startswith("customfield_")
+        return info.custom
+
+
+def fetch_index(client: JiraClient, site: str = "") -> FieldIndex:
+    return FieldIndex.from_api(client.get_json(FIELD_ENDPOINT), site)
+
+
+def load_or_fetch(
+    client: JiraClient,
+    path: str = DEFAULT_INDEX_PATH,
+    refresh: bool = False,
+) -> FieldIndex:
+    """
+    The saved index for this client's site, or a freshly fetched one (which is
+    then saved) when the file is missing, unreadable, from another site or
+    refresh is set.
+    """
+    site = client.base_url
+    if not refresh:
+        try:
+            index = FieldIndex.load(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            index = None
+        if index is not None and index.site == site:
+            return index
+
+    index = fetch_index(client, site)
+    index.save(path)
+    return index
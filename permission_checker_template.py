@@ -1,21 +1,21 @@
-import requests
 import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from jira_client import JiraClient
 
 ATLASSIAN_USER =""
 ATLASSIAN_API_TOKEN = ""
 
-# Get all permission schemes
+MAX_WORKERS = 8  # per-scheme grant fetches at the same time (fallback only)
+
+client = JiraClient("https://<YOUR-SITE>.atlassian.net", ATLASSIAN_USER, ATLASSIAN_API_TOKEN, pool_size=MAX_WORKERS)
 
-url_schemes = "https://<YOUR-SITE>.atlassian.net/rest/api/3/permissionscheme"
+# Get all permission schemes, with their grants in the same response
 
-response = requests.request(
-   "GET",
-   url_schemes,
-   auth=(ATLASSIAN_USER, ATLASSIAN_API_TOKEN),
-   headers={"Accept": "application/json"}
-)
+url_schemes = "/rest/api/3/permissionscheme"
 
-json_response_schemes = json.loads(response.text)
+json_response_schemes = client.get_json(url_schemes, params={"expand": "permissions"})
 
 scheme_ids = {}
 for scheme in json_response_schemes['permissionSchemes']:
@@ -29,32 +29,49 @@ with open(output_path, "w", encoding="utf-8") as f:
 
 # Get permission grants 
 
-url_perms_grants = "https://<YOUR-SITE>.atlassian.net/rest/api/3/permissionscheme/{permissionSchemeId}/permission"
+url_perms_grants = "/rest/api/3/permissionscheme/{permissionSchemeId}/permission"
 
-response = requests.request(
-   "GET",
-   url_perms_grants,
-   auth=(ATLASSIAN_USER, ATLASSIAN_API_TOKEN),
-   headers={"Accept": "application/json"}
-)
+grants_by_scheme = {
+   scheme['id']: scheme['permissions']
+   for scheme in json_response_schemes['permissionSchemes']
+   if scheme['id'] in scheme_ids and 'permissions' in scheme
+}
 
-grants_to_check = []
-
-for scheme_id in scheme_ids.keys():
+def get_scheme_grants(scheme_id):
    print(f"Getting permissions for scheme ID: {scheme_id}")
+   return client.get_json(url_perms_grants.format(permissionSchemeId=scheme_id))['permissions']
+
+# Fallback: schemes the bulk response didn't expand are fetched one call each, in parallel
+missing = [scheme_id for scheme_id in scheme_ids if scheme_id not in grants_by_scheme]
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+   for scheme_id, grants in zip(missing, pool.map(get_scheme_grants, missing)):
+      grants_by_scheme[scheme_id] = grants
 
-   response = requests.request(
-      "GET",
-      url_perms_grants.format(permissionSchemeId=scheme_id),
-      auth=(ATLASSIAN_USER, ATLASSIAN_API_TOKEN),
-      headers={"Accept": "application/json"}
-   )
-
-   json_perm_grants = json.loads(response.text)
-   for grant in json_perm_grants['permissions']:
-      # if grant['holder']['type'] != 'projectRole' and grant['holder']['type'] != 'group' and grant['holder']['type'] != 'user' and grant['holder']['type'] != 'applicationRole' and grant['holder']['type'] != 'sd.customer.portal.only':
-      if grant['holder']['type'] == 'anyone':
-         grants_to_check.append(f"Scheme name: {scheme_ids[scheme_id]} | Grant: {grant}")
+# Index every grant by (holder type, holder parameter, permission key)
+
+grant_index = defaultdict(list)
+for scheme_id, grants in grants_by_scheme.items():
+   for grant in grants:
+      holder = grant['holder']
+      parameter = holder.get('parameter') or holder.get('value')
+      grant_index[(holder['type'], parameter, grant['permission'])].append((scheme_id, grant))
+
+def find_grants(holder_type=None, parameter=None, permission=None):
+   """
+   Grants matching the given holder type / parameter / permission key (None matches anything),
+   e.g. find_grants('group', 'jira-users', 'BROWSE_PROJECTS') or find_grants('anyone').
+   """
+   if holder_type is not None and parameter is not None and permission is not None:
+      return list(grant_index.get((holder_type, parameter, permission), []))
+   found = []
+   for (t, p, k), entries in grant_index.items():
+      if (holder_type is None or t == holder_type) and (parameter is None or p == parameter) and (permission is None or k == permission):
+         found.extend(entries)
+   return found
+
+grants_to_check = []
+for scheme_id, grant in find_grants('anyone'):
+   grants_to_check.append(f"Scheme name: {scheme_ids[scheme_id]} | Grant: {grant}")
 
 output_path = r'<PATH>/grants_to_check.json'
 with open(output_path, "w", encoding="utf-8") as f: